@@ -479,6 +479,76 @@ def create_app():
         from backend.migrations.add_inventory_sold_to_eod import migrate
         migrate()
     
+    # CLI command to drop stored denomination totals from EOD table
+    @app.cli.command("drop-eod-denomination-totals")
+    def drop_eod_denomination_totals_command():
+        """Drop denom_*_total columns from eod table (totals are computed from counts)"""
+        from backend.migrations.drop_eod_denomination_totals import migrate
+        migrate()
+    
+    # CLI command to add generated storage usage column to tenants table
+    @app.cli.command("add-tenant-storage-usage")
+    def add_tenant_storage_usage_command():
+        """Add storage_usage_percent generated column and over-quota index to tenants table"""
+        from backend.migrations.add_tenant_storage_usage_percent import migrate
+        migrate()
+    
+    # CLI command to make the inventory -> stores foreign key deferrable
+    @app.cli.command("make-inventory-fk-deferrable")
+    def make_inventory_fk_deferrable_command():
+        """Recreate inventory_store_id_fkey as DEFERRABLE INITIALLY DEFERRED (required for store renames)"""
+        from backend.migrations.make_inventory_store_fk_deferrable import migrate
+        migrate()
+    
+    # CLI command to add composite store lookup indexes
+    @app.cli.command("add-store-lookup-indexes")
+    def add_store_lookup_indexes_command():
+        """Add (tenant_id, store_id) composite indexes to timeclock and eod tables"""
+        from backend.migrations.add_store_lookup_indexes import migrate
+        migrate()
+    
+    # CLI command to add bill_type CHECK constraint
+    @app.cli.command("add-billing-type-check")
+    def add_billing_type_check_command():
+        """Restrict store_billings.bill_type to lowercase electricity/wifi/gas"""
+        from backend.migrations.add_billing_type_check import migrate
+        migrate()
+    
+    # CLI command to add alerts keyset index
+    @app.cli.command("add-alerts-keyset-index")
+    def add_alerts_keyset_index_command():
+        """Add (tenant_id, manager_username, is_read, id) index to alerts table"""
+        from backend.migrations.add_alerts_keyset_index import migrate
+        migrate()
+    
+    # CLI command to normalize manager locations and regions
+    @app.cli.command("normalize-manager-locations")
+    def normalize_manager_locations_command():
+        """Trim managers.location and admin region entries"""
+        from backend.migrations.normalize_manager_locations import migrate
+        migrate()
+    
+    # CLI command to add partial index over open timeclock entries
+    @app.cli.command("add-timeclock-active-index")
+    def add_timeclock_active_index_command():
+        """Add (tenant_id, store_id, clock_in) WHERE clock_out IS NULL index to timeclock table"""
+        from backend.migrations.add_timeclock_active_index import migrate
+        migrate()
+    
+    # CLI command to add unique tenant phone number index to employees
+    @app.cli.command("add-employee-phone-unique-index")
+    def add_employee_phone_unique_index_command():
+        """Add unique (tenant_id, phone_number) index to employees table"""
+        from backend.migrations.add_employee_phone_unique_index import migrate
+        migrate()
+    
+    # CLI command to add covering date-range index to eod
+    @app.cli.command("add-eod-date-index")
+    def add_eod_date_index_command():
+        """Add covering (tenant_id, report_date, store_id) index to eod table"""
+        from backend.migrations.add_eod_date_index import migrate
+        migrate()
+    
     # CLI command to add default inventory to existing stores
     @app.cli.command("add-inventory-to-stores")
     def add_inventory_to_stores_command():
@@ -504,6 +574,15 @@ def create_app():
             click.echo(f"{store.name:20} {count:3} items")
         click.echo("-" * 40)
 
+    # CLI command to run auto clock-out for all tenants (for cron, outside the web workers)
+    @app.cli.command("auto-clockout")
+    def auto_clockout_command():
+        """Auto clock out employees past their store's auto clock-out time, for all tenants"""
+        from backend.routes.auto_clockout import run_auto_clockout_all_tenants
+        
+        auto_clocked_out = run_auto_clockout_all_tenants()
+        click.echo(f"✓ Auto clocked out {len(auto_clocked_out)} employee(s)")
+
     # CLI command to create billings table
     @app.cli.command("create-billings-table")
     def create_billings_table_command():
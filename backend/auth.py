@@ -7,9 +7,15 @@ from flask import request, jsonify, g
 from datetime import datetime, timedelta
 import jwt
 import hashlib
+import re
 import secrets
 from .config import Config
 
+_PASSWORD_SPECIAL_CHARS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
+
+# Unique-violation error text that mentions a username column/constraint (either order)
+_DUPLICATE_USERNAME_RE = re.compile(r"^(?=.*(?:UniqueViolation|duplicate key))(?=.*username)", re.IGNORECASE | re.DOTALL)
+
 # JWT secret key (use SECRET_KEY from config)
 def get_jwt_secret():
     """Get JWT secret key from config"""
@@ -128,7 +134,7 @@ def validate_password_strength(password):
     has_upper = any(c.isupper() for c in password)
     has_lower = any(c.islower() for c in password)
     has_digit = any(c.isdigit() for c in password)
-    has_special = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
+    has_special = any(c in _PASSWORD_SPECIAL_CHARS for c in password)
     
     errors = []
     if not has_upper:
@@ -145,3 +151,8 @@ def validate_password_strength(password):
     
     return True, None
 
+
+def is_duplicate_username_error(error):
+    """Check whether a database error is a unique violation on a manager username"""
+    return _DUPLICATE_USERNAME_RE.search(str(error)) is not None
+
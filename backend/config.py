@@ -90,6 +90,7 @@ class Config:
     engine_options = {
         "pool_pre_ping": True,  # Enable connection health checks
         "pool_recycle": 300,    # Recycle connections after 5 minutes
+        "query_cache_size": 1200,  # Compiled SQL cache entries (SQLAlchemy default is 500)
     }
     
     # Add SSL connect args for PostgreSQL (psycopg2)
@@ -108,6 +109,9 @@ class Config:
     SUPER_ADMIN_USERNAME = os.getenv('SUPER_ADMIN_USERNAME', 'superadmin')
     SUPER_ADMIN_PASSWORD = os.getenv('SUPER_ADMIN_PASSWORD', 'superadmin123')
     
+    # bcrypt work factor for password hashing (tune per deployment, ~250ms per hash)
+    BCRYPT_COST = int(os.getenv("BCRYPT_COST", "12"))
+    
     # Stripe configuration
     STRIPE_SECRET_KEY = STRIPE_SECRET_KEY
     
@@ -0,0 +1,39 @@
+"""
+Migration script to add a composite (tenant_id, manager_username, is_read, id) index to alerts table.
+Alert lists page by id (WHERE id < :cursor ORDER BY id DESC) and unread counts filter on the
+same leading columns, so both become index range scans.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add composite keyset index to alerts table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            print("Creating ix_alerts_tenant_manager_read_id index...")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_alerts_tenant_manager_read_id 
+                ON alerts(tenant_id, manager_username, is_read, id);
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: alerts keyset index added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,87 @@
+"""
+Migration script to add a CHECK constraint on store_billings.bill_type.
+update_billing_payment always writes lowercase bill types; the constraint guarantees it
+for every row. Legacy mixed-case rows are lowercased first; if that would collide with
+an existing row, or a row has an unknown bill type, the migration stops and lists them.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add ck_store_billings_bill_type CHECK constraint to store_billings table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            # Check if constraint already exists
+            result = db.session.execute(text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_constraint 
+                    WHERE conname = 'ck_store_billings_bill_type'
+                );
+            """))
+            constraint_exists = result.scalar()
+            
+            if constraint_exists:
+                print("✓ ck_store_billings_bill_type constraint already exists")
+                return
+            
+            # Lowercasing must not create duplicates under uq_tenant_store_bill_type_month
+            collisions = db.session.execute(text("""
+                SELECT tenant_id, store_id, LOWER(bill_type), billing_month, COUNT(*) 
+                FROM store_billings 
+                GROUP BY tenant_id, store_id, LOWER(bill_type), billing_month 
+                HAVING COUNT(*) > 1;
+            """)).fetchall()
+            if collisions:
+                db.session.rollback()
+                print("❌ Billings that differ only by bill_type case found; resolve them before adding the constraint:")
+                for tenant_id, store_id, bill_type, billing_month, count in collisions:
+                    print(f"  - tenant {tenant_id}, store {store_id}, {billing_month}: {bill_type} ({count} rows)")
+                return
+            
+            print("Normalizing bill types to lowercase...")
+            result = db.session.execute(text("""
+                UPDATE store_billings SET bill_type = LOWER(bill_type) 
+                WHERE bill_type <> LOWER(bill_type);
+            """))
+            print(f"  Normalized {result.rowcount} row(s)")
+            
+            invalid = db.session.execute(text("""
+                SELECT id, tenant_id, store_id, bill_type 
+                FROM store_billings 
+                WHERE bill_type NOT IN ('electricity', 'wifi', 'gas');
+            """)).fetchall()
+            if invalid:
+                db.session.rollback()
+                print("❌ Billings with unknown bill types found; fix or remove them before adding the constraint:")
+                for billing_id, tenant_id, store_id, bill_type in invalid:
+                    print(f"  - id {billing_id} (tenant {tenant_id}, store {store_id}): {bill_type!r}")
+                return
+            
+            print("Adding ck_store_billings_bill_type constraint...")
+            db.session.execute(text("""
+                ALTER TABLE store_billings 
+                ADD CONSTRAINT ck_store_billings_bill_type 
+                CHECK (bill_type IN ('electricity', 'wifi', 'gas'));
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: bill_type CHECK constraint added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,61 @@
+"""
+Migration script to add a unique (tenant_id, phone_number) index to employees table.
+Duplicate phone numbers are now rejected by the database instead of a pre-insert SELECT,
+which also closes the race between two concurrent creates. Blank phone numbers are
+normalized to NULL first, since the index only covers rows that have a phone number.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add unique tenant phone number index to employees table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            print("Normalizing blank employee phone numbers to NULL...")
+            db.session.execute(text("""
+                UPDATE employees SET phone_number = NULL 
+                WHERE phone_number IS NOT NULL AND TRIM(phone_number) = '';
+            """))
+            
+            duplicates = db.session.execute(text("""
+                SELECT tenant_id, phone_number, COUNT(*) 
+                FROM employees 
+                WHERE phone_number IS NOT NULL 
+                GROUP BY tenant_id, phone_number 
+                HAVING COUNT(*) > 1;
+            """)).fetchall()
+            if duplicates:
+                db.session.rollback()
+                print("❌ Duplicate employee phone numbers found; resolve them before adding the index:")
+                for tenant_id, phone_number, count in duplicates:
+                    print(f"  - tenant {tenant_id}: {phone_number} ({count} employees)")
+                return
+            
+            print("Creating ux_employees_tenant_phone index...")
+            db.session.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS ux_employees_tenant_phone 
+                ON employees(tenant_id, phone_number) 
+                WHERE phone_number IS NOT NULL;
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: employee phone unique index added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,50 @@
+"""
+Migration script to add a covering (tenant_id, report_date, store_id) index to eod table.
+The cash and card reports filter by tenant and date range (and optionally store), so on
+PostgreSQL the index INCLUDEs the id and amount columns they read and the reports become
+index-only scans. It is built CONCURRENTLY there so EOD submissions are not blocked;
+if a concurrent build fails, drop the invalid ix_eod_tenant_date_store and run again.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add covering date-range index to eod table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            print("Creating ix_eod_tenant_date_store index...")
+            if db.engine.dialect.name == 'postgresql':
+                # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+                with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    conn.execute(text("""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_eod_tenant_date_store 
+                        ON eod(tenant_id, report_date, store_id) 
+                        INCLUDE (id, cash_amount, credit_amount, card1_amount, qpay_amount);
+                    """))
+            else:
+                db.session.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_eod_tenant_date_store 
+                    ON eod(tenant_id, report_date, store_id);
+                """))
+                db.session.commit()
+            
+            print("✓ Migration complete: eod date index added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
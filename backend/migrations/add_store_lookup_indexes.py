@@ -0,0 +1,46 @@
+"""
+Migration script to add composite (tenant_id, store_id, ...) indexes to timeclock and eod tables.
+get_eods looks up clock-ins per store over a date range and store rename/delete cascades
+filter on tenant_id + store_id; inventory and inventory_history are already covered by
+their unique constraints.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add composite store lookup indexes to timeclock and eod tables"""
+    app = create_app()
+    with app.app_context():
+        try:
+            print("Creating ix_timeclock_tenant_store_clockin index...")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_timeclock_tenant_store_clockin 
+                ON timeclock(tenant_id, store_id, clock_in);
+            """))
+            
+            print("Creating ix_eod_tenant_store index...")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_eod_tenant_store 
+                ON eod(tenant_id, store_id);
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: store lookup indexes added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,59 @@
+"""
+Migration script to add the generated storage_usage_percent column to tenants table.
+The database keeps the percentage in sync with used/max storage, and a partial index
+lets quota dashboards find tenants above 90% usage without scanning every row.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add storage_usage_percent generated column and over-quota index to tenants table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            # Check if storage_usage_percent column already exists
+            result = db.session.execute(text("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.columns 
+                    WHERE table_name = 'tenants' 
+                    AND column_name = 'storage_usage_percent'
+                );
+            """))
+            column_exists = result.scalar()
+            
+            if column_exists:
+                print("✓ storage_usage_percent column already exists")
+            else:
+                print("Adding storage_usage_percent column...")
+                db.session.execute(text("""
+                    ALTER TABLE tenants 
+                    ADD COLUMN storage_usage_percent DOUBLE PRECISION 
+                    GENERATED ALWAYS AS (CAST(used_storage_bytes AS FLOAT) * 100 / NULLIF(max_storage_bytes, 0)) STORED;
+                """))
+            
+            print("Creating over-quota index...")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_tenants_over_quota 
+                ON tenants(id) WHERE storage_usage_percent > 90;
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: storage_usage_percent column and index added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,40 @@
+"""
+Migration script to add a partial (tenant_id, store_id, clock_in) WHERE clock_out IS NULL index to timeclock table.
+Auto clock-out only looks at entries that are still open, so the index stays small
+while most rows have clock_out set.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Add partial open-entries index to timeclock table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            print("Creating ix_timeclock_active index...")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_timeclock_active 
+                ON timeclock(tenant_id, store_id, clock_in) 
+                WHERE clock_out IS NULL;
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: timeclock active index added successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,62 @@
+"""
+Migration script to drop the denom_*_total columns from eod table.
+Each total is the bill count times its face value, so only the counts are stored;
+EOD.to_dict() computes the totals.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+DENOMINATION_TOTAL_COLUMNS = [
+    'denom_100_total',
+    'denom_50_total',
+    'denom_20_total',
+    'denom_10_total',
+    'denom_5_total',
+    'denom_1_total',
+]
+
+def migrate():
+    """Drop denom_*_total columns from eod table"""
+    app = create_app()
+    with app.app_context():
+        try:
+            # Check if table exists
+            result = db.session.execute(text("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.tables 
+                    WHERE table_name = 'eod'
+                );
+            """))
+            table_exists = result.scalar()
+            
+            if not table_exists:
+                print("⚠ eod table does not exist. This migration may not be needed.")
+                return
+            
+            for column_name in DENOMINATION_TOTAL_COLUMNS:
+                print(f"Dropping {column_name} column...")
+                db.session.execute(text(f"""
+                    ALTER TABLE eod 
+                    DROP COLUMN IF EXISTS {column_name};
+                """))
+            
+            db.session.commit()
+            print("✓ Migration complete: denomination total columns dropped successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,58 @@
+"""
+Migration script to recreate inventory_store_id_fkey as DEFERRABLE INITIALLY DEFERRED.
+Store renames update stores.name before the inventory rows that reference it, so the
+foreign key check must wait until commit. Running this once replaces the DDL that
+update_store used to execute on every rename.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from sqlalchemy import text
+
+def migrate():
+    """Make the inventory -> stores foreign key deferrable"""
+    app = create_app()
+    with app.app_context():
+        try:
+            # Check if constraint exists and whether it is already deferrable
+            result = db.session.execute(text("""
+                SELECT condeferrable FROM pg_constraint 
+                WHERE conname = 'inventory_store_id_fkey';
+            """))
+            row = result.fetchone()
+            
+            if row is None:
+                print("⚠ inventory_store_id_fkey does not exist. This migration may not be needed.")
+                return
+            
+            if row[0]:
+                print("✓ inventory_store_id_fkey is already deferrable")
+                return
+            
+            print("Recreating inventory_store_id_fkey as DEFERRABLE INITIALLY DEFERRED...")
+            db.session.execute(text("""
+                ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_store_id_fkey;
+                ALTER TABLE inventory ADD CONSTRAINT inventory_store_id_fkey 
+                    FOREIGN KEY (store_id) REFERENCES stores(name) 
+                    ON UPDATE CASCADE ON DELETE CASCADE 
+                    DEFERRABLE INITIALLY DEFERRED;
+            """))
+            
+            db.session.commit()
+            print("✓ Migration complete: inventory_store_id_fkey is now deferrable")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
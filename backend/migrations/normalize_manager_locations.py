@@ -0,0 +1,51 @@
+"""
+Migration script to trim manager locations and admin region entries.
+New writes are normalized by Manager (location validator, set_regions), so
+get_available_regions can use stored values without stripping them per request.
+"""
+import sys
+import io
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+from backend.app import create_app
+from backend.database import db
+from backend.models import Manager
+from sqlalchemy import text
+
+def migrate():
+    """Trim managers.location and normalize admin regions"""
+    app = create_app()
+    with app.app_context():
+        try:
+            print("Trimming manager locations...")
+            result = db.session.execute(text("""
+                UPDATE managers 
+                SET location = NULLIF(TRIM(location), '') 
+                WHERE location IS NOT NULL AND (location <> TRIM(location) OR location = '');
+            """))
+            print(f"  Updated {result.rowcount} location(s)")
+            
+            print("Normalizing admin regions...")
+            updated = 0
+            for admin in Manager.query.filter(Manager.is_admin == True, Manager.regions.isnot(None)):
+                original = admin.regions
+                admin.set_regions(admin.get_regions())
+                if admin.regions != original:
+                    updated += 1
+            print(f"  Updated {updated} admin region list(s)")
+            
+            db.session.commit()
+            print("✓ Migration complete: manager locations and regions normalized successfully")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate()
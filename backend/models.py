@@ -1,14 +1,36 @@
 # backend/models.py
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from flask import current_app
-from sqlalchemy import text
+from sqlalchemy import and_, case, func, or_, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import deferred, validates
 import bcrypt
 import json
+import orjson
+import re
+import time
 
+from backend.config import Config
 from backend.database import db
+from backend.utils.timezone_utils import now_et, et_to_utc_naive, get_app_timezone
 # Note: Model defaults use datetime.utcnow for database storage (UTC naive)
 # Application code should use timezone_utils for ET-aware timestamps
 
+# orjson options for to_json_bytes(): naive datetimes are UTC and rendered with a 'Z'
+# suffix (matching _iso_z() in to_dict()), and keys are sorted like orjson_response/jsonify
+_ORJSON_ROW_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_SORT_KEYS
+
+
+def _iso_z(value):
+    """ISO-format a UTC naive datetime with a trailing 'Z' (None passes through)"""
+    if not value:
+        return None
+    iso = value.isoformat()
+    if not iso.endswith('Z') and value.tzinfo is None:
+        iso += 'Z'
+    return iso
+
 # ================== SQLAlchemy Models ==================
 
 class Tenant(db.Model):
@@ -21,6 +43,11 @@ class Tenant(db.Model):
     plan = db.Column(db.String(50), nullable=False, default='basic')  # basic, standard, premium
     max_storage_bytes = db.Column(db.BigInteger, default=1073741824)  # 1GB default
     used_storage_bytes = db.Column(db.BigInteger, default=0)
+    # Computed by the database from the two columns above (NULL when max_storage_bytes is 0)
+    storage_usage_percent = db.Column(
+        db.Float,
+        db.Computed('CAST(used_storage_bytes AS FLOAT) * 100 / NULLIF(max_storage_bytes, 0)', persisted=True)
+    )
     status = db.Column(db.String(50), default='active')  # active, suspended, cancelled
     stripe_customer_id = db.Column(db.String(255), nullable=True, index=True)
     stripe_subscription_id = db.Column(db.String(255), nullable=True, index=True)
@@ -30,6 +57,11 @@ class Tenant(db.Model):
     # Relationships
     managers = db.relationship('Manager', back_populates='tenant', cascade='all, delete-orphan')
     
+    # Partial index for quota dashboards (tenants above 90% of their storage)
+    __table_args__ = (
+        db.Index('ix_tenants_over_quota', 'id', postgresql_where=text('storage_usage_percent > 90')),
+    )
+    
     def to_dict(self, include_password=False):
         data = {
             'id': self.id,
@@ -51,10 +83,8 @@ class Tenant(db.Model):
         return (self.used_storage_bytes + additional_bytes) <= self.max_storage_bytes
     
     def get_storage_usage_percent(self):
-        """Get storage usage as percentage"""
-        if self.max_storage_bytes == 0:
-            return 0
-        return (self.used_storage_bytes / self.max_storage_bytes) * 100
+        """Get storage usage as percentage (computed by the database)"""
+        return self.storage_usage_percent or 0
 
 
 class Manager(db.Model):
@@ -102,14 +132,25 @@ class Manager(db.Model):
     
     def get_regions(self):
         """Parse JSON regions field"""
+        return Manager.load_regions(self.regions)
+    
+    @staticmethod
+    def load_regions(raw):
+        """Parse a raw regions column value (JSON text) into a list"""
         try:
-            return json.loads(self.regions) if self.regions else []
+            return json.loads(raw) if raw else []
         except:
             return []
     
     def set_regions(self, regions_list):
-        """Serialize regions to JSON"""
+        """Serialize regions to JSON (entries are stripped; blank entries dropped)"""
+        regions_list = [r.strip() for r in regions_list or [] if isinstance(r, str) and r.strip()]
         self.regions = json.dumps(regions_list) if regions_list else None
+    
+    @validates('location')
+    def _strip_location(self, key, value):
+        """Store locations trimmed so region lookups can use them as-is"""
+        return value.strip() if value else value
 
 
 class Store(db.Model):
@@ -147,55 +188,33 @@ class Store(db.Model):
         db.UniqueConstraint('tenant_id', 'username', name='uq_tenant_store_username'),
     )
     
-    def to_dict(self, include_password=False):
+    def _created_at_iso(self):
+        """Serialize created_at, falling back to None if the stored value is malformed"""
+        if not self.created_at:
+            return None
         try:
-            # Safely serialize created_at
-            created_at_str = None
-            if self.created_at:
-                try:
-                    created_at_str = self.created_at.isoformat()
-                except (AttributeError, ValueError) as e:
-                    # If isoformat fails, try str() or set to None
-                    try:
-                        created_at_str = str(self.created_at)
-                    except:
-                        created_at_str = None
-            
-            data = {
-                'id': str(self.id) if self.id else None,
-                'tenant_id': self.tenant_id,
-                'name': self.name,
-                'username': self.username,
-                'total_boxes': self.total_boxes,
-                'manager_username': self.manager_username,
-                'allowed_ip': self.allowed_ip,
-                'opening_time': self.opening_time,
-                'closing_time': self.closing_time,
-                'timezone': self.timezone,
-                'created_at': created_at_str
-            }
-            if include_password:
-                data['password'] = self.password
-            return data
-        except Exception as e:
-            # Log error and return minimal data
-            import traceback
-            print(f"Error in Store.to_dict() for store {getattr(self, 'id', 'unknown')}: {e}")
-            print(traceback.format_exc())
-            # Return minimal dict with safe values
-            return {
-                'id': str(self.id) if hasattr(self, 'id') and self.id else None,
-                'tenant_id': getattr(self, 'tenant_id', None),
-                'name': getattr(self, 'name', 'Unknown'),
-                'username': getattr(self, 'username', None),
-                'total_boxes': getattr(self, 'total_boxes', 0),
-                'manager_username': getattr(self, 'manager_username', None),
-                'allowed_ip': getattr(self, 'allowed_ip', None),
-                'opening_time': getattr(self, 'opening_time', None),
-                'closing_time': getattr(self, 'closing_time', None),
-                'timezone': getattr(self, 'timezone', None),
-                'created_at': None
-            }
+            return self.created_at.isoformat()
+        except (AttributeError, ValueError):
+            current_app.logger.exception("Could not serialize created_at for store %s", self.id)
+            return None
+    
+    def to_dict(self, include_password=False):
+        data = {
+            'id': str(self.id) if self.id else None,
+            'tenant_id': self.tenant_id,
+            'name': self.name,
+            'username': self.username,
+            'total_boxes': self.total_boxes,
+            'manager_username': self.manager_username,
+            'allowed_ip': self.allowed_ip,
+            'opening_time': self.opening_time,
+            'closing_time': self.closing_time,
+            'timezone': self.timezone,
+            'created_at': self._created_at_iso()
+        }
+        if include_password:
+            data['password'] = self.password
+        return data
 
 
 class Employee(db.Model):
@@ -212,7 +231,8 @@ class Employee(db.Model):
     face_registered = db.Column(db.Boolean, default=False)
     face_descriptor = db.Column(db.Text, nullable=True)  # JSON array
     face_descriptors = db.Column(db.Text, nullable=True)  # JSON array of arrays
-    face_image = db.Column(db.Text, nullable=True)  # Base64 encoded image
+    # Base64 encoded image - deferred so employee row loads don't pull (and detoast) it
+    face_image = deferred(db.Column(db.Text, nullable=True))
     face_registered_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -222,6 +242,15 @@ class Employee(db.Model):
     # Relationships
     timeclock_entries = db.relationship('TimeClock', back_populates='employee', cascade='all, delete-orphan')
     
+    # Phone numbers are unique per tenant; employees without one are not constrained
+    __table_args__ = (
+        db.Index(
+            'ux_employees_tenant_phone', 'tenant_id', 'phone_number', unique=True,
+            postgresql_where=text('phone_number IS NOT NULL'),
+            sqlite_where=text('phone_number IS NOT NULL')
+        ),
+    )
+    
     def get_face_descriptor(self):
         """Parse JSON face_descriptor field"""
         try:
@@ -244,8 +273,8 @@ class Employee(db.Model):
         """Serialize face_descriptors to JSON"""
         self.face_descriptors = json.dumps(descriptors) if descriptors else None
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_face=False):
+        data = {
             'employee_id': str(self.id),
             'tenant_id': self.tenant_id,
             'store_id': self.store_id,
@@ -255,10 +284,13 @@ class Employee(db.Model):
             'hourly_pay': self.hourly_pay,
             'active': self.active,
             'face_registered': self.face_registered,
-            'face_descriptor': self.get_face_descriptor(),
-            'face_descriptors': self.get_face_descriptors(),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        # Face descriptors are only needed for matching; keep them out of list payloads
+        if include_face:
+            data['face_descriptor'] = self.get_face_descriptor()
+            data['face_descriptors'] = self.get_face_descriptors()
+        return data
 
 
 class Inventory(db.Model):
@@ -352,8 +384,9 @@ class TimeClock(db.Model):
     clock_in = db.Column(db.DateTime, nullable=False, index=True)
     clock_out = db.Column(db.DateTime, nullable=True)
     hours_worked = db.Column(db.Float, nullable=True)
-    clock_in_face_image = db.Column(db.Text, nullable=True)  # Base64 image
-    clock_out_face_image = db.Column(db.Text, nullable=True)  # Base64 image
+    # Base64 images - deferred, only loaded when accessed
+    clock_in_face_image = deferred(db.Column(db.Text, nullable=True))
+    clock_out_face_image = deferred(db.Column(db.Text, nullable=True))
     clock_in_confidence = db.Column(db.Float, nullable=True)
     clock_out_confidence = db.Column(db.Float, nullable=True)
     clock_out_type = db.Column(db.String(20), nullable=True)  # 'MANUAL', 'AUTO' - how clock-out occurred
@@ -362,29 +395,43 @@ class TimeClock(db.Model):
     tenant = db.relationship('Tenant')
     employee = db.relationship('Employee', back_populates='timeclock_entries')
     
-    def to_dict(self):
-        clock_in_iso = self.clock_in.isoformat() if self.clock_in else None
-        if clock_in_iso and not clock_in_iso.endswith('Z') and self.clock_in.tzinfo is None:
-            clock_in_iso += 'Z'
-        
-        clock_out_iso = self.clock_out.isoformat() if self.clock_out else None
-        if clock_out_iso and not clock_out_iso.endswith('Z') and self.clock_out.tzinfo is None:
-            clock_out_iso += 'Z'
-        
+    # Composite index for per-store clock_in range lookups (EOD employees worked), plus a
+    # partial one over open entries only for the auto clock-out scan
+    __table_args__ = (
+        db.Index('ix_timeclock_tenant_store_clockin', 'tenant_id', 'store_id', 'clock_in'),
+        db.Index(
+            'ix_timeclock_active', 'tenant_id', 'store_id', 'clock_in',
+            postgresql_where=text('clock_out IS NULL'),
+            sqlite_where=text('clock_out IS NULL')
+        ),
+    )
+    
+    def _fields(self):
+        """Column values keyed for the API, with datetimes left unformatted"""
         return {
             'entry_id': str(self.id),
             'tenant_id': self.tenant_id,
             'employee_id': str(self.employee_id),
             'employee_name': self.employee_name,
             'store_id': self.store_id,
-            'clock_in': clock_in_iso,
-            'clock_out': clock_out_iso,
+            'clock_in': self.clock_in,
+            'clock_out': self.clock_out,
             'hours_worked': self.hours_worked,
             'clock_in_confidence': self.clock_in_confidence,
             'clock_out_confidence': self.clock_out_confidence,
             'clock_out_type': self.clock_out_type,
             'status': 'clocked_out' if self.clock_out else 'clocked_in'
         }
+    
+    def to_dict(self):
+        data = self._fields()
+        data['clock_in'] = _iso_z(self.clock_in)
+        data['clock_out'] = _iso_z(self.clock_out)
+        return data
+    
+    def to_json_bytes(self):
+        """Serialize to the same JSON as to_dict(); orjson formats the datetimes natively"""
+        return orjson.dumps(self._fields(), option=_ORJSON_ROW_OPTIONS)
 
 
 class Alert(db.Model):
@@ -406,6 +453,11 @@ class Alert(db.Model):
     tenant = db.relationship('Tenant')
     employee = db.relationship('Employee')
     
+    # Composite index for per-manager alert pages (keyset on id) and unread counts
+    __table_args__ = (
+        db.Index('ix_alerts_tenant_manager_read_id', 'tenant_id', 'manager_username', 'is_read', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -440,19 +492,14 @@ class EOD(db.Model):
     inventory_sold = db.Column(db.Integer, default=0)
     over_short = db.Column(db.Float, default=0)
     total1 = db.Column(db.Float, default=0)
-    # Denominations
+    # Denominations - only the bill counts are stored; each denom_X_total is
+    # count * face value and is computed in _fields()
     denom_100_count = db.Column(db.Integer, default=0)
-    denom_100_total = db.Column(db.Float, default=0)
     denom_50_count = db.Column(db.Integer, default=0)
-    denom_50_total = db.Column(db.Float, default=0)
     denom_20_count = db.Column(db.Integer, default=0)
-    denom_20_total = db.Column(db.Float, default=0)
     denom_10_count = db.Column(db.Integer, default=0)
-    denom_10_total = db.Column(db.Float, default=0)
     denom_5_count = db.Column(db.Integer, default=0)
-    denom_5_total = db.Column(db.Float, default=0)
     denom_1_count = db.Column(db.Integer, default=0)
-    denom_1_total = db.Column(db.Float, default=0)
     total_bills = db.Column(db.Float, default=0)
     submitted_by = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -462,11 +509,18 @@ class EOD(db.Model):
     # Store relationship - handled via queries (no SQLAlchemy relationship)
     # Use get_store_by_name(name, tenant_id=...) function instead
     
-    def to_dict(self):
-        created_at_iso = self.created_at.isoformat() if self.created_at else None
-        if created_at_iso and not created_at_iso.endswith('Z') and self.created_at.tzinfo is None:
-            created_at_iso += 'Z'
-        
+    # Composite index for per-store lookups (EOD lists, store rename/delete cascades)
+    # and a covering date-range index so the cash/card reports are index-only on PostgreSQL
+    __table_args__ = (
+        db.Index('ix_eod_tenant_store', 'tenant_id', 'store_id'),
+        db.Index(
+            'ix_eod_tenant_date_store', 'tenant_id', 'report_date', 'store_id',
+            postgresql_include=['id', 'cash_amount', 'credit_amount', 'card1_amount', 'qpay_amount']
+        ),
+    )
+    
+    def _fields(self):
+        """Column values keyed for the API, with datetimes left unformatted"""
         return {
             'id': str(self.id),
             'tenant_id': self.tenant_id,
@@ -484,21 +538,30 @@ class EOD(db.Model):
             'over_short': self.over_short,
             'total1': self.total1,
             'denom_100_count': self.denom_100_count,
-            'denom_100_total': self.denom_100_total,
+            'denom_100_total': (self.denom_100_count or 0) * 100.0,
             'denom_50_count': self.denom_50_count,
-            'denom_50_total': self.denom_50_total,
+            'denom_50_total': (self.denom_50_count or 0) * 50.0,
             'denom_20_count': self.denom_20_count,
-            'denom_20_total': self.denom_20_total,
+            'denom_20_total': (self.denom_20_count or 0) * 20.0,
             'denom_10_count': self.denom_10_count,
-            'denom_10_total': self.denom_10_total,
+            'denom_10_total': (self.denom_10_count or 0) * 10.0,
             'denom_5_count': self.denom_5_count,
-            'denom_5_total': self.denom_5_total,
+            'denom_5_total': (self.denom_5_count or 0) * 5.0,
             'denom_1_count': self.denom_1_count,
-            'denom_1_total': self.denom_1_total,
+            'denom_1_total': (self.denom_1_count or 0) * 1.0,
             'total_bills': self.total_bills,
             'submitted_by': self.submitted_by,
-            'created_at': created_at_iso
+            'created_at': self.created_at
         }
+    
+    def to_dict(self):
+        data = self._fields()
+        data['created_at'] = _iso_z(self.created_at)
+        return data
+    
+    def to_json_bytes(self, **extra):
+        """Serialize to the same JSON as to_dict() plus any extra keys; orjson formats the datetimes natively"""
+        return orjson.dumps({**self._fields(), **extra}, option=_ORJSON_ROW_OPTIONS)
 
 
 class StoreBilling(db.Model):
@@ -521,6 +584,7 @@ class StoreBilling(db.Model):
     # Composite unique constraint on tenant_id + store_id + bill_type + billing_month
     __table_args__ = (
         db.UniqueConstraint('tenant_id', 'store_id', 'bill_type', 'billing_month', name='uq_tenant_store_bill_type_month'),
+        db.CheckConstraint("bill_type IN ('electricity', 'wifi', 'gas')", name='ck_store_billings_bill_type'),
     )
     
     def to_dict(self):
@@ -552,9 +616,22 @@ class StoreBilling(db.Model):
 
 # ================== Helper Functions ==================
 
+# Hash prefixes accepted by verify_password ($2y$ is emitted by PHP-style bcrypt)
+_BCRYPT_PREFIXES = ('$2b$', '$2a$', '$2y$')
+
+# Longest password accepted when creating/updating accounts; anything longer can't match
+MAX_PASSWORD_LENGTH = 200
+
+
 def hash_password(password):
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(Config.BCRYPT_COST)).decode('utf-8')
+
+
+def hash_passwords(passwords):
+    """Hash many passwords in parallel (bcrypt releases the GIL), e.g. for bulk onboarding"""
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(hash_password, passwords))
 
 
 def verify_password(password, hashed):
@@ -567,8 +644,12 @@ def verify_password(password, hashed):
     if not password or not hashed:
         return False
     
+    # Reject oversized input before running bcrypt - no stored password can be this long
+    if len(password) > MAX_PASSWORD_LENGTH:
+        return False
+    
     # Only accept bcrypt hashed passwords
-    if not (hashed.startswith('$2b$') or hashed.startswith('$2a$')):
+    if not hashed.startswith(_BCRYPT_PREFIXES):
         # Password is not hashed - reject it for security
         return False
     
@@ -653,9 +734,17 @@ def get_default_inventory_items():
 
 # ================== Tenant Functions ==================
 
+# Storage quota in bytes per subscription plan
+_PLAN_LIMITS = {
+    'basic': 1 << 30,            # 1GB
+    'standard': 10 * (1 << 30),  # 10GB
+    'premium': 100 * (1 << 30)   # 100GB
+}
+
+
 def get_tenant_by_id(tenant_id):
     """Get a tenant by ID"""
-    tenant = Tenant.query.get(tenant_id)
+    tenant = db.session.get(Tenant, tenant_id)
     return tenant.to_dict() if tenant else None
 
 
@@ -666,19 +755,13 @@ def get_tenant_by_email(email):
 
 
 def create_tenant(company_name, email, password_hash, plan='basic', stripe_customer_id=None, stripe_subscription_id=None):
-    """Create a new tenant"""
+    """Create a new tenant and return its ID"""
     # Check if email already exists
-    existing = Tenant.query.filter_by(email=email).first()
-    if existing:
+    if db.session.query(Tenant.query.filter_by(email=email).exists()).scalar():
         raise ValueError(f"Tenant with email '{email}' already exists")
     
     # Set storage limits based on plan
-    plan_limits = {
-        'basic': 1073741824,      # 1GB
-        'standard': 10737418240,   # 10GB
-        'premium': 107374182400    # 100GB
-    }
-    max_storage = plan_limits.get(plan, 1073741824)
+    max_storage = _PLAN_LIMITS.get(plan, _PLAN_LIMITS['basic'])
     
     tenant = Tenant(
         company_name=company_name,
@@ -692,37 +775,37 @@ def create_tenant(company_name, email, password_hash, plan='basic', stripe_custo
     db.session.add(tenant)
     db.session.commit()
     
-    return tenant.to_dict()
+    return tenant.id
 
 
 def update_tenant_storage(tenant_id, additional_bytes):
-    """Update tenant storage usage"""
-    tenant = Tenant.query.get(tenant_id)
-    if not tenant:
+    """Update tenant storage usage and return the new used_storage_bytes"""
+    # Single atomic UPDATE clamped at zero, so concurrent uploads can't overwrite each other
+    # (CASE rather than GREATEST so it also runs on the SQLite fallback)
+    new_used = Tenant.used_storage_bytes + additional_bytes
+    result = db.session.execute(
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(used_storage_bytes=case((new_used < 0, 0), else_=new_used))
+        .returning(Tenant.used_storage_bytes)
+    )
+    used_storage_bytes = result.scalar()
+    if used_storage_bytes is None:
+        db.session.rollback()
         raise ValueError(f"Tenant with ID {tenant_id} not found")
     
-    tenant.used_storage_bytes += additional_bytes
-    if tenant.used_storage_bytes < 0:
-        tenant.used_storage_bytes = 0
-    
     db.session.commit()
-    return tenant.to_dict()
+    return used_storage_bytes
 
 
 def update_tenant_plan(tenant_id, plan, stripe_subscription_id=None):
     """Update tenant plan and storage limits"""
-    tenant = Tenant.query.get(tenant_id)
+    tenant = db.session.get(Tenant, tenant_id)
     if not tenant:
         raise ValueError(f"Tenant with ID {tenant_id} not found")
     
-    plan_limits = {
-        'basic': 1073741824,      # 1GB
-        'standard': 10737418240,   # 10GB
-        'premium': 107374182400    # 100GB
-    }
-    
     tenant.plan = plan
-    tenant.max_storage_bytes = plan_limits.get(plan, 1073741824)
+    tenant.max_storage_bytes = _PLAN_LIMITS.get(plan, _PLAN_LIMITS['basic'])
     if stripe_subscription_id:
         tenant.stripe_subscription_id = stripe_subscription_id
     
@@ -741,20 +824,71 @@ def get_manager_by_username(username, tenant_id=None):
     return manager.to_dict(include_password=True) if manager else None
 
 
+def get_manager_with_tenant_status(username):
+    """
+    Get a manager by username together with its tenant's status, in one query.
+    Returns (manager_dict, tenant_status); tenant_status is None if the tenant row is missing.
+    """
+    row = db.session.query(Manager, Tenant.status).outerjoin(
+        Tenant, Tenant.id == Manager.tenant_id
+    ).filter(Manager.username == username).first()
+    if not row:
+        return None, None
+    manager, tenant_status = row
+    return manager.to_dict(include_password=True), tenant_status
+
+
+# Columns returned by get_all_managers (Manager.to_dict without the password)
+_MANAGER_LIST_COLUMNS = (
+    Manager.id, Manager.tenant_id, Manager.name, Manager.username, Manager.location,
+    Manager.is_super_admin, Manager.is_admin, Manager.regions, Manager.created_at
+)
+
+
+def _manager_list(query):
+    """Build manager dicts from a _MANAGER_LIST_COLUMNS query, skipping ORM instance construction"""
+    result = []
+    for row in query:
+        manager = row._asdict()
+        manager['regions'] = Manager.load_regions(row.regions)
+        manager['created_at'] = row.created_at.isoformat() if row.created_at else None
+        result.append(manager)
+    return result
+
+
 def get_all_managers(tenant_id=None):
     """Get all managers (excluding passwords), optionally filtered by tenant_id"""
-    query = Manager.query
+    query = db.session.query(*_MANAGER_LIST_COLUMNS)
     if tenant_id:
-        query = query.filter_by(tenant_id=tenant_id)
-    managers = query.all()
-    return [m.to_dict() for m in managers]
+        query = query.filter(Manager.tenant_id == tenant_id)
+    return _manager_list(query)
+
+
+def get_admins(tenant_id):
+    """Get admin accounts (excluding passwords) for a tenant"""
+    query = db.session.query(*_MANAGER_LIST_COLUMNS).filter(
+        Manager.tenant_id == tenant_id,
+        Manager.is_admin == True
+    )
+    return _manager_list(query)
+
+
+def get_store_managers(tenant_id, regions=None):
+    """Get plain store managers (not admins or super admins) for a tenant, optionally limited to regions"""
+    query = db.session.query(*_MANAGER_LIST_COLUMNS).filter(
+        Manager.tenant_id == tenant_id,
+        Manager.is_super_admin == False,
+        Manager.is_admin == False
+    )
+    if regions is not None:
+        query = query.filter(Manager.location.in_(regions))
+    return _manager_list(query)
 
 
 def create_manager(tenant_id, name, username, password, location=None, is_super_admin=False, is_admin=False, regions=None):
     """Create a new manager account"""
     # Check if username already exists for this tenant
-    existing = Manager.query.filter_by(tenant_id=tenant_id, username=username).first()
-    if existing:
+    if db.session.query(Manager.query.filter_by(tenant_id=tenant_id, username=username).exists()).scalar():
         raise ValueError(f"Manager username '{username}' already exists for this tenant")
     
     # Hash the password
@@ -790,15 +924,17 @@ def update_manager(tenant_id, username, name=None, new_username=None, password=N
     # If username is changing, update all related data FIRST
     if new_username is not None and new_username != old_username:
         # Check if new username is already taken by another manager in the same tenant
-        username_taken = Manager.query.filter_by(tenant_id=tenant_id, username=new_username).first()
+        username_taken = db.session.query(
+            Manager.query.filter_by(tenant_id=tenant_id, username=new_username).exists()
+        ).scalar()
         if username_taken:
             raise ValueError(f"Manager username '{new_username}' is already taken")
         
         # Update stores that reference this manager's username
-        Store.query.filter_by(tenant_id=tenant_id, manager_username=old_username).update({Store.manager_username: new_username})
-        
-        # Commit the related table updates first
-        db.session.commit()
+        Store.query.filter_by(tenant_id=tenant_id, manager_username=old_username).update(
+            {Store.manager_username: new_username},
+            synchronize_session=False
+        )
     
     # Now update the manager itself
     if name is not None:
@@ -810,7 +946,8 @@ def update_manager(tenant_id, username, name=None, new_username=None, password=N
     if location is not None:
         manager.location = location
     
-    if password is not None:
+    # Blank password means "unchanged" - skip the bcrypt hash entirely
+    if password:
         manager.password = hash_password(password)
     
     if is_admin is not None:
@@ -819,7 +956,7 @@ def update_manager(tenant_id, username, name=None, new_username=None, password=N
     if regions is not None:
         manager.set_regions(regions)
     
-    # Commit the manager update
+    # Commit the store references and the manager update together
     db.session.commit()
     
     return manager.to_dict()
@@ -885,53 +1022,39 @@ def get_store_by_name(name, tenant_id=None):
         query = query.filter_by(tenant_id=tenant_id)
     return query.first()
 
+
+def store_exists(tenant_id, name, manager_username=None):
+    """Check whether a store exists in a tenant (optionally owned by manager_username)"""
+    # EXISTS over the uq_tenant_store_name index; no Store instance is loaded
+    query = Store.query.filter_by(tenant_id=tenant_id, name=name)
+    if manager_username:
+        query = query.filter_by(manager_username=manager_username)
+    return db.session.query(query.exists()).scalar()
+
+# Columns returned by get_stores (Store.to_dict without the password)
+_STORE_LIST_COLUMNS = (
+    Store.id, Store.tenant_id, Store.name, Store.username, Store.total_boxes,
+    Store.manager_username, Store.allowed_ip, Store.opening_time, Store.closing_time,
+    Store.timezone, Store.created_at
+)
+
+
 def get_stores(tenant_id=None, manager_username=None):
     """Get stores, optionally filtered by tenant_id and/or manager_username"""
-    try:
-        query = Store.query
-        if tenant_id:
-            query = query.filter_by(tenant_id=tenant_id)
-        if manager_username:
-            query = query.filter_by(manager_username=manager_username)
-        stores = query.all()
-        
-        # Convert stores to dicts with error handling
-        result = []
-        for store in stores:
-            try:
-                result.append(store.to_dict())
-            except Exception as e:
-                # Log error for this specific store but continue with others
-                import traceback
-                print(f"Error converting store {store.id} to dict: {e}")
-                print(traceback.format_exc())
-                # Try to create a minimal dict with available data
-                try:
-                    result.append({
-                        'id': str(store.id),
-                        'tenant_id': store.tenant_id,
-                        'name': store.name,
-                        'username': store.username,
-                        'total_boxes': store.total_boxes,
-                        'manager_username': store.manager_username,
-                        'allowed_ip': store.allowed_ip,
-                        'opening_time': store.opening_time,
-                        'closing_time': store.closing_time,
-                        'timezone': store.timezone,
-                        'created_at': None  # Fallback if serialization fails
-                    })
-                except Exception as fallback_error:
-                    print(f"Error in fallback dict creation: {fallback_error}")
-                    # Skip this store if even fallback fails
-                    continue
-        
-        return result
-    except Exception as e:
-        # Log the full error
-        import traceback
-        print(f"Error in get_stores: {e}")
-        print(traceback.format_exc())
-        raise
+    # Select plain columns and build dicts from the rows, skipping ORM instance construction
+    query = db.session.query(*_STORE_LIST_COLUMNS)
+    if tenant_id:
+        query = query.filter(Store.tenant_id == tenant_id)
+    if manager_username:
+        query = query.filter(Store.manager_username == manager_username)
+    
+    result = []
+    for row in query:
+        store = row._asdict()
+        store['id'] = str(row.id)
+        store['created_at'] = row.created_at.isoformat() if row.created_at else None
+        result.append(store)
+    return result
 
 
 def update_store(tenant_id, name, new_name=None, username=None, password=None, total_boxes=None, allowed_ip=None, opening_time=None, closing_time=None, timezone=None):
@@ -943,79 +1066,56 @@ def update_store(tenant_id, name, new_name=None, username=None, password=None, t
     old_name = name
     
     # If the store name is changing, we need to handle FK constraints carefully
-    # The FK constraint checks the NEW value immediately, so we need to work around it
-    # Strategy: Make the FK constraint DEFERRABLE if it isn't already, then defer it
+    # The FK constraint checks the NEW value immediately, so it is made DEFERRABLE once
+    # by the make-inventory-fk-deferrable migration and deferred for this transaction
     if new_name is not None and new_name != old_name:
-        # Check if FK constraint exists and make it DEFERRABLE if needed
-        try:
-            # Try to alter the constraint to be DEFERRABLE (if it exists)
-            # This is safe to run multiple times - if already deferrable, it does nothing
-            db.session.execute(text("""
-                DO $$
-                BEGIN
-                    -- Check if constraint exists and alter it to be DEFERRABLE
-                    IF EXISTS (
-                        SELECT 1 FROM pg_constraint 
-                        WHERE conname = 'inventory_store_id_fkey'
-                    ) THEN
-                        -- Drop and recreate as DEFERRABLE
-                        ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_store_id_fkey;
-                        ALTER TABLE inventory ADD CONSTRAINT inventory_store_id_fkey 
-                            FOREIGN KEY (store_id) REFERENCES stores(name) 
-                            ON UPDATE CASCADE ON DELETE CASCADE 
-                            DEFERRABLE INITIALLY DEFERRED;
-                    END IF;
-                END $$;
-            """))
-            db.session.commit()  # Commit the constraint modification
-            
-            # Now defer the constraint for this transaction
-            db.session.execute(text("SET CONSTRAINTS inventory_store_id_fkey DEFERRED"))
-        except Exception as e:
-            # If we can't modify the constraint, try the update anyway
-            # The constraint might already be deferrable or we'll handle the error
-            db.session.rollback()
-            pass
+        if db.engine.dialect.name == 'postgresql':
+            try:
+                # Savepoint so a missing or non-deferrable constraint doesn't abort the rename
+                with db.session.begin_nested():
+                    db.session.execute(text("SET CONSTRAINTS inventory_store_id_fkey DEFERRED"))
+            except Exception as e:
+                print(f"Warning: Could not defer inventory_store_id_fkey (run make-inventory-fk-deferrable): {e}")
         
         # First, update the store name
         store.name = new_name
         db.session.flush()  # Make store name change visible in transaction
         
         # Now update all related tables (FK constraint check is deferred until commit)
-        # Update inventory items (has FK constraint: inventory_store_id_fkey)
-        Inventory.query.filter_by(tenant_id=tenant_id, store_id=old_name).update(
-            {Inventory.store_id: new_name}, 
-            synchronize_session=False
-        )
-        
-        # Update inventory history
-        InventoryHistory.query.filter_by(tenant_id=tenant_id, store_id=old_name).update(
-            {InventoryHistory.store_id: new_name}, 
-            synchronize_session=False
-        )
-        
-        # Update EOD reports
-        EOD.query.filter_by(tenant_id=tenant_id, store_id=old_name).update(
-            {EOD.store_id: new_name}, 
-            synchronize_session=False
-        )
-        
-        # Update timeclock entries
-        TimeClock.query.filter_by(tenant_id=tenant_id, store_id=old_name).update(
-            {TimeClock.store_id: new_name}, 
-            synchronize_session=False
-        )
-        
-        # Update employee store_id references
-        Employee.query.filter_by(tenant_id=tenant_id, store_id=old_name).update(
-            {Employee.store_id: new_name}, 
-            synchronize_session=False
-        )
+        # Only inventory has an FK to stores.name, so ON UPDATE CASCADE can't cover the
+        # rest; on PostgreSQL the five updates run as one statement via data-modifying CTEs
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(text("""
+                WITH u_inventory AS (
+                    UPDATE inventory SET store_id = :new_name
+                    WHERE tenant_id = :tenant_id AND store_id = :old_name RETURNING 1
+                ), u_inventory_history AS (
+                    UPDATE inventory_history SET store_id = :new_name
+                    WHERE tenant_id = :tenant_id AND store_id = :old_name RETURNING 1
+                ), u_eod AS (
+                    UPDATE eod SET store_id = :new_name
+                    WHERE tenant_id = :tenant_id AND store_id = :old_name RETURNING 1
+                ), u_timeclock AS (
+                    UPDATE timeclock SET store_id = :new_name
+                    WHERE tenant_id = :tenant_id AND store_id = :old_name RETURNING 1
+                ), u_employees AS (
+                    UPDATE employees SET store_id = :new_name
+                    WHERE tenant_id = :tenant_id AND store_id = :old_name RETURNING 1
+                )
+                SELECT 1
+            """), {'tenant_id': tenant_id, 'old_name': old_name, 'new_name': new_name})
+        else:
+            for model in (Inventory, InventoryHistory, EOD, TimeClock, Employee):
+                model.query.filter_by(tenant_id=tenant_id, store_id=old_name).update(
+                    {model.store_id: new_name},
+                    synchronize_session=False
+                )
     
     # Update other store fields
     if username is not None:
         store.username = username
-    if password is not None:
+    # Blank password means "unchanged" - skip the bcrypt hash entirely
+    if password:
         store.password = hash_password(password)
     if total_boxes is not None:
         store.total_boxes = total_boxes
@@ -1042,19 +1142,22 @@ def delete_store(tenant_id, name):
     
     # Delete all related data BEFORE deleting the store to avoid FK constraint violations
     # Delete inventory items (has FK constraint: inventory_store_id_fkey)
-    Inventory.query.filter_by(tenant_id=tenant_id, store_id=name).delete()
+    Inventory.query.filter_by(tenant_id=tenant_id, store_id=name).delete(synchronize_session=False)
     
     # Delete inventory history (may have FK constraint)
-    InventoryHistory.query.filter_by(tenant_id=tenant_id, store_id=name).delete()
+    InventoryHistory.query.filter_by(tenant_id=tenant_id, store_id=name).delete(synchronize_session=False)
     
     # Delete EOD reports (may have FK constraint)
-    EOD.query.filter_by(tenant_id=tenant_id, store_id=name).delete()
+    EOD.query.filter_by(tenant_id=tenant_id, store_id=name).delete(synchronize_session=False)
     
     # Delete timeclock entries
-    TimeClock.query.filter_by(tenant_id=tenant_id, store_id=name).delete()
+    TimeClock.query.filter_by(tenant_id=tenant_id, store_id=name).delete(synchronize_session=False)
     
     # Clear employee store_id references (set to NULL)
-    Employee.query.filter_by(tenant_id=tenant_id, store_id=name).update({Employee.store_id: None})
+    Employee.query.filter_by(tenant_id=tenant_id, store_id=name).update(
+        {Employee.store_id: None},
+        synchronize_session=False
+    )
     
     # Now delete the store itself
     db.session.delete(store)
@@ -1067,29 +1170,39 @@ def delete_store(tenant_id, name):
 
 # ================== Employee Functions ==================
 
+# Violation of ux_employees_tenant_phone: PostgreSQL names the index in the error,
+# SQLite names its columns
+_DUPLICATE_PHONE_RE = re.compile(
+    r"ux_employees_tenant_phone|UNIQUE constraint failed: employees\.tenant_id, employees\.phone_number"
+)
+
+
+def _is_duplicate_phone_error(error):
+    """Check whether an IntegrityError is a duplicate tenant phone number"""
+    return _DUPLICATE_PHONE_RE.search(str(error.orig)) is not None
+
+
 def create_employee(tenant_id, store_id, name, role=None, phone_number=None, hourly_pay=None):
     """Create a new employee"""
-    # Check for duplicate phone number if phone_number is provided
-    if phone_number and phone_number.strip():
-        phone_number_clean = phone_number.strip()
-        existing_employee = Employee.query.filter_by(
-            tenant_id=tenant_id,
-            phone_number=phone_number_clean
-        ).first()
-        if existing_employee:
-            raise ValueError(f"An employee with phone number {phone_number_clean} already exists.")
-    
+    phone_number = (phone_number.strip() or None) if phone_number else None
     employee = Employee(
         tenant_id=tenant_id,
         store_id=store_id,
         name=name,
         role=role,
-        phone_number=phone_number.strip() if phone_number else None,
+        phone_number=phone_number,
         hourly_pay=hourly_pay,
         active=True
     )
     db.session.add(employee)
-    db.session.commit()
+    # Duplicate phone numbers are rejected by ux_employees_tenant_phone
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if _is_duplicate_phone_error(e):
+            raise ValueError(f"An employee with phone number {phone_number} already exists.")
+        raise
     return str(employee.id)
 
 
@@ -1105,31 +1218,52 @@ def get_employees(tenant_id=None, store_id=None):
 
 
 def update_employee(employee_id, tenant_id=None, phone_number=None, hourly_pay=None):
-    """Update an employee's phone number and/or hourly pay"""
+    """Update an employee's phone number and/or hourly pay and return the updated employee dict (None if not found)"""
     try:
-        employee = Employee.query.get(int(employee_id))
-        if not employee:
-            return False
-        
-        # Verify employee belongs to tenant if tenant_id is provided
-        if tenant_id is not None and employee.tenant_id != tenant_id:
-            return False
-        
+        employee_id = int(employee_id)
+        values = {}
         if phone_number is not None:
-            employee.phone_number = phone_number
+            values['phone_number'] = phone_number.strip() or None
         if hourly_pay is not None:
-            employee.hourly_pay = float(hourly_pay) if hourly_pay else None
-        
-        db.session.commit()
-        return True
+            values['hourly_pay'] = float(hourly_pay) if hourly_pay else None
     except (ValueError, TypeError):
-        return False
+        return None
+    
+    if not values:
+        employee = db.session.get(Employee, employee_id)
+        if not employee or (tenant_id is not None and employee.tenant_id != tenant_id):
+            return None
+        return employee.to_dict()
+    
+    # Single UPDATE ... WHERE id (AND tenant_id) RETURNING; the tenant check and the
+    # write happen in one statement, and no matching row means not found
+    stmt = update(Employee).where(Employee.id == employee_id)
+    if tenant_id is not None:
+        stmt = stmt.where(Employee.tenant_id == tenant_id)
+    stmt = stmt.values(**values).returning(Employee)
+    
+    # Duplicate phone numbers are rejected by ux_employees_tenant_phone
+    try:
+        employee = db.session.scalars(stmt, execution_options={'populate_existing': True}).one_or_none()
+    except IntegrityError as e:
+        db.session.rollback()
+        if _is_duplicate_phone_error(e):
+            raise ValueError(f"An employee with phone number {values.get('phone_number')} already exists.")
+        raise
+    if employee is None:
+        db.session.rollback()
+        return None
+    
+    # Serialize before commit so the expired instance isn't reloaded with another SELECT
+    result = employee.to_dict()
+    db.session.commit()
+    return result
 
 
 def delete_employee(employee_id):
     """Delete an employee"""
     try:
-        employee = Employee.query.get(int(employee_id))
+        employee = db.session.get(Employee, int(employee_id))
         if not employee:
             return False
         db.session.delete(employee)
@@ -1148,18 +1282,6 @@ def add_inventory_item(tenant_id, store_id, sku, name, quantity=0, device_type='
     if device_type not in valid_types:
         device_type = 'metro'  # Default to metro if invalid
     
-    # Check if item already exists (check by SKU + Name combination, not just SKU)
-    # Multiple items can have the same SKU but different names
-    existing_item = Inventory.query.filter_by(
-        tenant_id=tenant_id,
-        store_id=store_id,
-        sku=sku,
-        name=name
-    ).first()
-    
-    if existing_item:
-        raise ValueError(f"An item with SKU '{sku}' and name '{name}' already exists for this store. Please use a different name or update the existing item.")
-    
     item = Inventory(
         tenant_id=tenant_id,
         store_id=store_id,
@@ -1169,7 +1291,14 @@ def add_inventory_item(tenant_id, store_id, sku, name, quantity=0, device_type='
         device_type=device_type
     )
     db.session.add(item)
-    db.session.commit()
+    
+    # Duplicates are rejected by the (tenant_id, store_id, sku, name) unique constraint
+    # Multiple items can have the same SKU but different names
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise ValueError(f"An item with SKU '{sku}' and name '{name}' already exists for this store. Please use a different name or update the existing item.")
     return str(item.id)
 
 
@@ -1189,18 +1318,7 @@ def update_inventory_item(tenant_id, store_id, sku=None, item_id=None, quantity=
     if not item:
         return False
     
-    # If SKU is changing, check if new (SKU, name) combination already exists
-    # Multiple items can have the same SKU but different names
     if new_sku is not None:
-        new_name = name if name is not None else item.name
-        existing = Inventory.query.filter_by(
-            tenant_id=tenant_id, 
-            store_id=store_id, 
-            sku=new_sku,
-            name=new_name
-        ).filter(Inventory.id != item.id).first()
-        if existing:
-            return False
         item.sku = new_sku
     
     if quantity is not None:
@@ -1213,7 +1331,13 @@ def update_inventory_item(tenant_id, store_id, sku=None, item_id=None, quantity=
         if device_type in valid_types:
             item.device_type = device_type
     
-    db.session.commit()
+    # A (SKU, name) pair already used by another item violates the unique constraint
+    # Multiple items can have the same SKU but different names
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
     return True
 
 
@@ -1244,76 +1368,41 @@ def get_inventory(tenant_id=None, store_id=None, device_type=None):
 def add_default_inventory_to_store(tenant_id, store_name):
     """
     Add default inventory items to a store.
-    Checks for existing items to avoid duplicates.
+    Items the store already has are skipped via ON CONFLICT DO NOTHING.
     Returns the number of items created.
     """
     from backend.database import db
     # Import models here to avoid circular imports
     from backend.models import Inventory
     
-    default_items = get_default_inventory_items()
+    rows = [
+        {
+            'tenant_id': tenant_id,
+            'store_id': store_name,
+            'sku': item["sku"],
+            'name': item["name"],
+            'quantity': 0,
+            'device_type': item.get("device_type", "metro"),  # Default to metro if not specified
+            'created_at': datetime.utcnow(),
+        }
+        for item in get_default_inventory_items()
+    ]
     
-    # Batch fetch existing items to reduce database queries
-    existing_items = Inventory.query.filter_by(
-        tenant_id=tenant_id,
-        store_id=store_name
-    ).all()
-    
-    # Create a set of existing (sku, name) combinations for fast lookup
-    existing_combinations = set()
-    existing_skus = set()
-    for existing in existing_items:
-        existing_combinations.add((existing.sku, existing.name))
-        existing_skus.add(existing.sku)
-    
-    # Batch create items
-    items_to_create = []
-    for item in default_items:
-        sku = item["sku"]
-        name = item["name"]
-        device_type = item.get("device_type", "metro")  # Default to metro if not specified
-        
-        # Skip if already exists (check both new and old constraint formats)
-        if (sku, name) in existing_combinations or sku in existing_skus:
-            continue
-        
-        try:
-            inventory_item = Inventory(
-                tenant_id=tenant_id,
-                store_id=store_name,
-                sku=sku,
-                name=name,
-                quantity=0,
-                device_type=device_type
-            )
-            items_to_create.append(inventory_item)
-        except Exception as item_error:
-            print(f"Warning: Failed to prepare inventory item {sku}/{name}: {item_error}")
-            continue
+    # Single INSERT ... ON CONFLICT DO NOTHING: items the store already has are
+    # skipped by whichever unique constraint is in place (old or new format)
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
     
-    # Batch insert all items at once
-    if items_to_create:
-        try:
-            db.session.bulk_save_objects(items_to_create)
-            db.session.commit()
-            return len(items_to_create)
-        except Exception as e:
-            db.session.rollback()
-            # If bulk insert fails (e.g., due to constraints), try individual inserts
-            created_count = 0
-            for item in items_to_create:
-                try:
-                    db.session.add(item)
-                    db.session.commit()
-                    created_count += 1
-                except Exception as item_error:
-                    db.session.rollback()
-                    error_str = str(item_error)
-                    if "UniqueViolation" not in error_str and "duplicate key" not in error_str.lower():
-                        print(f"Warning: Failed to add inventory item {item.sku}/{item.name}: {item_error}")
-            return created_count
-    
-    return 0
+    try:
+        result = db.session.execute(insert(Inventory.__table__).values(rows).on_conflict_do_nothing())
+        db.session.commit()
+        return result.rowcount
+    except Exception as e:
+        db.session.rollback()
+        print(f"Warning: Failed to add default inventory to store {store_name}: {e}")
+        return 0
 
 
 # ================== EOD Functions ==================
@@ -1336,8 +1425,8 @@ def create_alert(tenant_id, store_id, manager_username, alert_type, title, messa
     return alert.to_dict()
 
 
-def get_alerts(tenant_id, manager_username=None, store_id=None, is_read=None, limit=100):
-    """Get alerts for a manager, optionally filtered by store and read status"""
+def _filter_alerts(tenant_id, manager_username=None, store_id=None, is_read=None):
+    """Build the alert query shared by get_alerts and count_alerts"""
     query = Alert.query.filter_by(tenant_id=tenant_id)
     
     if manager_username:
@@ -1346,11 +1435,27 @@ def get_alerts(tenant_id, manager_username=None, store_id=None, is_read=None, li
         query = query.filter_by(store_id=store_id)
     if is_read is not None:
         query = query.filter_by(is_read=is_read)
-    
-    alerts = query.order_by(Alert.created_at.desc()).limit(limit).all()
+    return query
+
+
+def get_alerts(tenant_id, manager_username=None, store_id=None, is_read=None, limit=100, before_id=None):
+    """
+    Get alerts for a manager, newest first, optionally filtered by store and read status.
+    Pass the last id of a page as before_id to fetch the next page (keyset pagination).
+    """
+    query = _filter_alerts(tenant_id, manager_username, store_id, is_read)
+    if before_id is not None:
+        query = query.filter(Alert.id < before_id)
+    alerts = query.order_by(Alert.id.desc()).limit(limit).all()
     return [alert.to_dict() for alert in alerts]
 
 
+def count_alerts(tenant_id, manager_username=None, store_id=None, is_read=None):
+    """Count alerts for a manager with a SQL COUNT, without loading any rows"""
+    query = _filter_alerts(tenant_id, manager_username, store_id, is_read)
+    return query.with_entities(func.count(Alert.id)).scalar()
+
+
 def mark_alert_read(alert_id, tenant_id):
     """Mark an alert as read"""
     alert = Alert.query.filter_by(id=alert_id, tenant_id=tenant_id).first()
@@ -1362,8 +1467,8 @@ def mark_alert_read(alert_id, tenant_id):
 
 
 def create_eod(tenant_id, store_id, report_date, notes=None, cash_amount=0, credit_amount=0, card1_amount=0, qpay_amount=0, boxes_count=0, accessories_amount=0, magenta_amount=0, inventory_sold=0, over_short=0, total1=0, 
-               denom_100_count=0, denom_100_total=0, denom_50_count=0, denom_50_total=0, denom_20_count=0, denom_20_total=0, 
-               denom_10_count=0, denom_10_total=0, denom_5_count=0, denom_5_total=0, denom_1_count=0, denom_1_total=0, total_bills=0, submitted_by=None):
+               denom_100_count=0, denom_50_count=0, denom_20_count=0, 
+               denom_10_count=0, denom_5_count=0, denom_1_count=0, total_bills=0, submitted_by=None):
     """Create an EOD report"""
     eod = EOD(
         tenant_id=tenant_id,
@@ -1381,17 +1486,11 @@ def create_eod(tenant_id, store_id, report_date, notes=None, cash_amount=0, cred
         over_short=over_short,
         total1=total1,
         denom_100_count=denom_100_count,
-        denom_100_total=denom_100_total,
         denom_50_count=denom_50_count,
-        denom_50_total=denom_50_total,
         denom_20_count=denom_20_count,
-        denom_20_total=denom_20_total,
         denom_10_count=denom_10_count,
-        denom_10_total=denom_10_total,
         denom_5_count=denom_5_count,
-        denom_5_total=denom_5_total,
         denom_1_count=denom_1_count,
-        denom_1_total=denom_1_total,
         total_bills=total_bills,
         submitted_by=submitted_by or "Unknown"
     )
@@ -1400,8 +1499,39 @@ def create_eod(tenant_id, store_id, report_date, notes=None, cash_amount=0, cred
     return str(eod.id)
 
 
-def get_eods(tenant_id=None, store_id=None):
-    """Get EOD reports, optionally filtered by tenant_id and/or store_id"""
+def create_eods(tenant_id, reports):
+    """
+    Create several EOD reports in a single transaction.
+    
+    reports is a list of dicts of create_eod keyword arguments (without tenant_id).
+    Returns the new report ids, in the same order.
+    """
+    eods = [
+        EOD(
+            tenant_id=tenant_id,
+            **{
+                **report,
+                "notes": report.get("notes") or "",
+                "submitted_by": report.get("submitted_by") or "Unknown"
+            }
+        )
+        for report in reports
+    ]
+    db.session.add_all(eods)
+    # Flush to assign primary keys (batched into multi-row INSERTs), then commit once;
+    # a failure anywhere leaves none of the reports behind
+    try:
+        db.session.flush()
+        ids = [str(eod.id) for eod in eods]
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return ids
+
+
+def _eods_with_employees(tenant_id=None, store_id=None):
+    """EOD reports (newest first) paired with the sorted names of employees who clocked in that day"""
     query = EOD.query
     if tenant_id:
         query = query.filter_by(tenant_id=tenant_id)
@@ -1409,51 +1539,95 @@ def get_eods(tenant_id=None, store_id=None):
         query = query.filter_by(store_id=store_id)
     eods = query.order_by(EOD.report_date.desc()).all()
     
-    results = []
+    # Resolve each report's calendar day once; unparseable dates get no employees
+    report_days = {}
     for eod in eods:
-        eod_dict = eod.to_dict()
+        if not (eod.report_date and eod.store_id):
+            continue
+        try:
+            report_days[eod.id] = datetime.fromisoformat(eod.report_date.replace('Z', '+00:00')).date()
+        except ValueError as e:
+            print(f"Error parsing EOD report date {eod.report_date!r}: {e}")
+    
+    # One timeclock query covering only the report days, bucketed by (tenant, store, day)
+    employees_by_day = {}
+    if report_days:
+        # Merge consecutive report days into [start, end) ranges so reports months
+        # apart don't pull every clock-in in between
+        day_ranges = []
+        for day in sorted(set(report_days.values())):
+            if day_ranges and day_ranges[-1][1] == day:
+                day_ranges[-1][1] = day + timedelta(days=1)
+            else:
+                day_ranges.append([day, day + timedelta(days=1)])
         
-        # Get employees who worked on this report date
-        report_date = eod.report_date
-        store = eod.store_id
-        tenant_id = eod.tenant_id
-        if report_date and store:
-            try:
-                from datetime import datetime as dt, timedelta
-                report_dt = dt.fromisoformat(report_date.replace('Z', '+00:00')) if isinstance(report_date, str) else report_date
-                day_start = report_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-                day_end = day_start + timedelta(days=1)
-                
-                # Find all timeclock entries for this tenant/store on this date
-                entries = TimeClock.query.filter(
-                    TimeClock.tenant_id == tenant_id,
-                    TimeClock.store_id == store,
-                    TimeClock.clock_in >= day_start,
-                    TimeClock.clock_in < day_end
-                ).all()
-                
-                # Extract unique employee names
-                employee_names = list(set([entry.employee_name for entry in entries if entry.employee_name]))
-                employee_names.sort()
-                eod_dict["employees_worked"] = employee_names
-            except Exception as e:
-                print(f"Error getting employees for EOD: {e}")
-                eod_dict["employees_worked"] = []
-        else:
-            eod_dict["employees_worked"] = []
+        entries = TimeClock.query.with_entities(
+            TimeClock.tenant_id, TimeClock.store_id, TimeClock.clock_in, TimeClock.employee_name
+        ).filter(
+            or_(*(
+                and_(
+                    TimeClock.clock_in >= datetime.combine(start, datetime.min.time()),
+                    TimeClock.clock_in < datetime.combine(end, datetime.min.time())
+                )
+                for start, end in day_ranges
+            ))
+        )
+        if tenant_id:
+            entries = entries.filter(TimeClock.tenant_id == tenant_id)
+        if store_id:
+            entries = entries.filter(TimeClock.store_id == store_id)
         
-        results.append(eod_dict)
+        for entry_tenant, entry_store, clock_in, employee_name in entries:
+            if employee_name:
+                employees_by_day.setdefault((entry_tenant, entry_store, clock_in.date()), set()).add(employee_name)
+    
+    results = []
+    for eod in eods:
+        report_day = report_days.get(eod.id)
+        employees_worked = sorted(
+            employees_by_day.get((eod.tenant_id, eod.store_id, report_day), ())
+        ) if report_day else []
+        results.append((eod, employees_worked))
     
     return results
 
 
+def get_eods(tenant_id=None, store_id=None):
+    """Get EOD reports, optionally filtered by tenant_id and/or store_id"""
+    return [
+        {**eod.to_dict(), "employees_worked": employees_worked}
+        for eod, employees_worked in _eods_with_employees(tenant_id, store_id)
+    ]
+
+
+def get_eods_json(tenant_id=None, store_id=None):
+    """Same reports as get_eods, each serialized to JSON bytes (for list responses)"""
+    return [
+        eod.to_json_bytes(employees_worked=employees_worked)
+        for eod, employees_worked in _eods_with_employees(tenant_id, store_id)
+    ]
+
+
 # ================== Billing Functions ==================
 
+# (expires_at epoch seconds, 'YYYY-MM') - valid until the next ET month boundary
+_billing_month_cache = (0.0, None)
+
+
 def get_current_billing_month():
     """Get current billing month in YYYY-MM format"""
-    # Get current month in ET, format as YYYY-MM
-    from backend.utils.timezone_utils import now_et
-    return now_et().strftime('%Y-%m')
+    global _billing_month_cache
+    expires_at, billing_month = _billing_month_cache
+    if time.time() < expires_at:
+        return billing_month
+    
+    # Get current month in ET, format as YYYY-MM, and cache it until the month rolls over
+    now = now_et()
+    billing_month = now.strftime('%Y-%m')
+    next_year, next_month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+    month_end = get_app_timezone().localize(datetime(next_year, next_month, 1))
+    _billing_month_cache = (month_end.timestamp(), billing_month)
+    return billing_month
 
 
 def get_store_billings(tenant_id=None, store_id=None, billing_month=None):
@@ -1470,20 +1644,31 @@ def get_store_billings(tenant_id=None, store_id=None, billing_month=None):
     return [b.to_dict() for b in billings]
 
 
-def get_billings_by_stores(tenant_id, billing_month=None):
-    """Get billings grouped by store for managers view (current month only)"""
+def get_billings_by_stores(tenant_id, billing_month=None, store_names=None):
+    """Get billings grouped by store for managers view (current month only)
+    
+    If store_names is given, only billings for those stores are fetched.
+    """
     if billing_month is None:
         billing_month = get_current_billing_month()
+    if store_names is not None and not store_names:
+        return {}
     
-    billings = StoreBilling.query.filter_by(
+    # Only the columns needed for the summary - no StoreBilling instances
+    query = db.session.query(
+        StoreBilling.store_id, StoreBilling.bill_type, StoreBilling.paid, StoreBilling.amount
+    ).filter_by(
         tenant_id=tenant_id,
         billing_month=billing_month
-    ).all()
+    )
+    if store_names is not None:
+        query = query.filter(StoreBilling.store_id.in_(store_names))
+    rows = query.all()
     
-    # Group by store
+    # Group by store; bill_type is normalized and checked in case a legacy row predates
+    # ck_store_billings_bill_type, so it can't add a stray key or shadow the real bill
     store_billings = {}
-    for billing in billings:
-        store_id = billing.store_id
+    for store_id, bill_type, paid, amount in rows:
         if store_id not in store_billings:
             store_billings[store_id] = {
                 'electricity': {'paid': False, 'amount': 0},
@@ -1491,11 +1676,11 @@ def get_billings_by_stores(tenant_id, billing_month=None):
                 'gas': {'paid': False, 'amount': 0}
             }
         
-        bill_type = billing.bill_type.lower()
+        bill_type = bill_type.lower()
         if bill_type in store_billings[store_id]:
             store_billings[store_id][bill_type] = {
-                'paid': billing.paid,
-                'amount': float(billing.amount) if billing.paid else 0
+                'paid': paid,
+                'amount': float(amount) if paid else 0
             }
     
     return store_billings
@@ -1510,37 +1695,40 @@ def update_billing_payment(tenant_id, store_id, bill_type, amount, billing_month
     if bill_type_lower not in ['electricity', 'wifi', 'gas']:
         raise ValueError(f"Invalid bill type: {bill_type}")
     
-    # Find existing billing for current month
-    billing = StoreBilling.query.filter_by(
-        tenant_id=tenant_id,
-        store_id=store_id,
-        bill_type=bill_type_lower,
-        billing_month=billing_month
-    ).first()
-    
     # Store payment date as UTC naive (from ET)
-    from backend.utils.timezone_utils import now_et, et_to_utc_naive
+    payment_date = et_to_utc_naive(now_et())
     
-    if billing:
-        # Update existing billing
-        billing.amount = float(amount)
-        billing.paid = True
-        billing.payment_date = et_to_utc_naive(now_et())
+    # Create or update the current month's billing in one INSERT ... ON CONFLICT DO UPDATE
+    # against uq_tenant_store_bill_type_month
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
     else:
-        # Create new billing for current month
-        billing = StoreBilling(
-            tenant_id=tenant_id,
-            store_id=store_id,
-            bill_type=bill_type_lower,
-            billing_month=billing_month,
-            amount=float(amount),
-            paid=True,
-            payment_date=et_to_utc_naive(now_et())
-        )
-        db.session.add(billing)
+        from sqlalchemy.dialects.sqlite import insert
     
+    stmt = insert(StoreBilling).values(
+        tenant_id=tenant_id,
+        store_id=store_id,
+        bill_type=bill_type_lower,
+        billing_month=billing_month,
+        amount=float(amount),
+        paid=True,
+        payment_date=payment_date
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['tenant_id', 'store_id', 'bill_type', 'billing_month'],
+        set_={
+            'amount': stmt.excluded.amount,
+            'paid': True,
+            'payment_date': stmt.excluded.payment_date,
+            'updated_at': datetime.utcnow()
+        }
+    ).returning(StoreBilling)
+    
+    billing = db.session.scalars(stmt, execution_options={'populate_existing': True}).one()
+    # Serialize before commit so the expired instance isn't reloaded with another SELECT
+    result = billing.to_dict()
     db.session.commit()
-    return billing.to_dict()
+    return result
 
 
 def reset_monthly_billings(tenant_id, billing_month=None):
@@ -1556,218 +1744,6 @@ def reset_monthly_billings(tenant_id, billing_month=None):
     StoreBilling.query.filter_by(
         tenant_id=tenant_id,
         billing_month=billing_month
-    ).delete()
+    ).delete(synchronize_session=False)
     
     db.session.commit()
-
-
-# ================== Deprecated/Legacy Functions ==================
-# These are kept for backward compatibility
-
-def get_collection(name):
-    """
-    Deprecated: This function is kept for backward compatibility with routes
-    that directly access collections. Returns a wrapper object that provides
-    MongoDB-like access patterns but uses SQLAlchemy underneath.
-    """
-    class CollectionWrapper:
-        def __init__(self, model_class):
-            self.model_class = model_class
-        
-        def find_one(self, query, projection=None):
-            """MongoDB-like find_one"""
-            obj = None
-            if '_id' in query:
-                try:
-                    obj = self.model_class.query.get(int(query['_id']))
-                except:
-                    return None
-            else:
-                # Build SQLAlchemy query from dict
-                q = self.model_class.query
-                for key, value in query.items():
-                    if hasattr(self.model_class, key):
-                        q = q.filter(getattr(self.model_class, key) == value)
-                obj = q.first()
-            
-            if obj:
-                result = obj.to_dict() if hasattr(obj, 'to_dict') else {}
-                if projection and '_id' in projection and projection['_id'] == 0:
-                    result.pop('id', None)
-                    result.pop('_id', None)
-                return result
-            return None
-        
-        def find(self, query, projection=None):
-            """MongoDB-like find"""
-            q = self.model_class.query
-            for key, value in query.items():
-                if hasattr(self.model_class, key):
-                    if isinstance(value, dict):
-                        # Handle comparison operators
-                        for op, op_value in value.items():
-                            if op == '$gte':
-                                q = q.filter(getattr(self.model_class, key) >= op_value)
-                            elif op == '$lt':
-                                q = q.filter(getattr(self.model_class, key) < op_value)
-                            elif op == '$ne':
-                                q = q.filter(getattr(self.model_class, key) != op_value)
-                    else:
-                        q = q.filter(getattr(self.model_class, key) == value)
-            return CollectionCursor(q, projection)
-        
-        def insert_one(self, document):
-            """MongoDB-like insert_one"""
-            obj = self.model_class(**document)
-            db.session.add(obj)
-            db.session.commit()
-            
-            class InsertResult:
-                def __init__(self, obj_id):
-                    self.inserted_id = obj_id
-            
-            return InsertResult(obj.id)
-        
-        def update_one(self, query, update, upsert=False):
-            """MongoDB-like update_one"""
-            obj = None
-            if '_id' in query:
-                try:
-                    obj = self.model_class.query.get(int(query['_id']))
-                except:
-                    pass
-            else:
-                q = self.model_class.query
-                for key, value in query.items():
-                    if hasattr(self.model_class, key):
-                        q = q.filter(getattr(self.model_class, key) == value)
-                obj = q.first()
-            
-            if obj:
-                if '$set' in update:
-                    for key, value in update['$set'].items():
-                        if hasattr(obj, key):
-                            setattr(obj, key, value)
-                db.session.commit()
-                
-                class UpdateResult:
-                    def __init__(self, modified):
-                        self.modified_count = 1 if modified else 0
-                
-                return UpdateResult(True)
-            
-            class UpdateResult:
-                def __init__(self, modified):
-                    self.modified_count = 0
-            return UpdateResult(False)
-        
-        def update_many(self, query, update):
-            """MongoDB-like update_many"""
-            q = self.model_class.query
-            for key, value in query.items():
-                if hasattr(self.model_class, key):
-                    q = q.filter(getattr(self.model_class, key) == value)
-            
-            count = 0
-            if '$set' in update:
-                count = q.update(update['$set'])
-                db.session.commit()
-            
-            class UpdateResult:
-                def __init__(self, modified):
-                    self.modified_count = modified
-            return UpdateResult(count)
-        
-        def delete_one(self, query):
-            """MongoDB-like delete_one"""
-            obj = None
-            if '_id' in query:
-                try:
-                    obj = self.model_class.query.get(int(query['_id']))
-                except:
-                    pass
-            else:
-                q = self.model_class.query
-                for key, value in query.items():
-                    if hasattr(self.model_class, key):
-                        q = q.filter(getattr(self.model_class, key) == value)
-                obj = q.first()
-            
-            if obj:
-                db.session.delete(obj)
-                db.session.commit()
-                
-                class DeleteResult:
-                    def __init__(self, deleted):
-                        self.deleted_count = 1 if deleted else 0
-                return DeleteResult(True)
-            
-            class DeleteResult:
-                def __init__(self, deleted):
-                    self.deleted_count = 0
-            return DeleteResult(False)
-        
-        def delete_many(self, query):
-            """MongoDB-like delete_many"""
-            q = self.model_class.query
-            for key, value in query.items():
-                if hasattr(self.model_class, key):
-                    q = q.filter(getattr(self.model_class, key) == value)
-            
-            count = q.count()
-            q.delete()
-            db.session.commit()
-            
-            class DeleteResult:
-                def __init__(self, deleted):
-                    self.deleted_count = deleted
-            return DeleteResult(count)
-    
-    class CollectionCursor:
-        def __init__(self, query, projection=None):
-            self.query = query
-            self.projection = projection
-            self._sort_field = None
-            self._sort_direction = 1
-        
-        def sort(self, field, direction=1):
-            """MongoDB-like sort"""
-            self._sort_field = field
-            self._sort_direction = direction
-            return self
-        
-        def __iter__(self):
-            """Make cursor iterable"""
-            q = self.query
-            if self._sort_field and hasattr(q.column_descriptions[0]['type'], self._sort_field):
-                attr = getattr(q.column_descriptions[0]['type'], self._sort_field)
-                if self._sort_direction == -1:
-                    q = q.order_by(attr.desc())
-                else:
-                    q = q.order_by(attr)
-            
-            for obj in q.all():
-                result = obj.to_dict() if hasattr(obj, 'to_dict') else {}
-                if self.projection and '_id' in self.projection and self.projection['_id'] == 0:
-                    result.pop('id', None)
-                    result.pop('_id', None)
-                yield result
-    
-    # Map collection names to models
-    collection_map = {
-        'managers': Manager,
-        'stores': Store,
-        'employees': Employee,
-        'inventory': Inventory,
-        'inventory_history': InventoryHistory,
-        'timeclock': TimeClock,
-        'eod': EOD
-    }
-    
-    if name in collection_map:
-        return CollectionWrapper(collection_map[name])
-    
-    # If collection doesn't exist, return a dummy wrapper
-    class DummyModel:
-        pass
-    return CollectionWrapper(DummyModel)
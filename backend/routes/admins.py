@@ -1,8 +1,10 @@
 # backend/routes/admins.py
-from flask import Blueprint, request, jsonify, g
-from ..models import get_all_managers, create_manager, update_manager, get_manager_by_username, verify_password
+from flask import Blueprint, request, jsonify, g, current_app
+from sqlalchemy.exc import IntegrityError
+from ..database import db
+from ..models import get_admins, create_manager, update_manager, get_manager_by_username, get_manager_with_tenant_status, verify_password
 from ..config import Config
-from ..auth import generate_token, validate_password_strength, require_auth
+from ..auth import generate_token, validate_password_strength, is_duplicate_username_error, require_auth
 
 bp = Blueprint("admins", __name__)
 
@@ -11,9 +13,7 @@ bp = Blueprint("admins", __name__)
 def list_admins():
     """List all admins for the current tenant (super-admin only)"""
     tenant_id = g.tenant_id
-    managers = get_all_managers(tenant_id=tenant_id)
-    # Filter to only admins
-    admins = [m for m in managers if m.get('is_admin', False)]
+    admins = get_admins(tenant_id=tenant_id)
     return jsonify(admins)
 
 @bp.get("/available-regions")
@@ -24,28 +24,28 @@ def get_available_regions():
     from ..models import Manager
     
     # Get all unique locations from managers (excluding super admins and admins)
-    managers = Manager.query.filter_by(tenant_id=tenant_id).filter(
+    # Locations and regions are stored trimmed (see Manager), so only de-duplication is left
+    rows = db.session.query(Manager.location).filter(
+        Manager.tenant_id == tenant_id,
         Manager.location.isnot(None),
+        Manager.location != '',
         Manager.is_super_admin == False,
         Manager.is_admin == False
-    ).all()
-    
-    locations_set = set()
-    for manager in managers:
-        if manager.location and manager.location.strip():
-            locations_set.add(manager.location.strip())
+    ).distinct().all()
+    locations_set = {row[0] for row in rows}
     
     # Also include locations from existing admins' regions (in case they were assigned custom regions)
-    admins = Manager.query.filter_by(tenant_id=tenant_id, is_admin=True).all()
-    for admin in admins:
-        admin_regions = admin.get_regions()
-        if admin_regions:
-            for region in admin_regions:
-                if region and region.strip():
-                    locations_set.add(region.strip())
+    # Only the distinct raw regions JSON values are fetched, not full admin rows
+    region_rows = db.session.query(Manager.regions).filter(
+        Manager.tenant_id == tenant_id,
+        Manager.is_admin == True,
+        Manager.regions.isnot(None)
+    ).distinct().all()
+    for (raw_regions,) in region_rows:
+        locations_set.update(Manager.load_regions(raw_regions))
     
     # Convert to sorted list
-    locations = sorted(list(locations_set))
+    locations = sorted(locations_set)
     
     return jsonify(locations)
 
@@ -102,13 +102,15 @@ def add_admin():
         return jsonify(admin_info), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        # Database unique constraint violation for username
+        if is_duplicate_username_error(e.orig):
+            return jsonify({"error": "Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to create admin")
+        return jsonify({"error": f"Failed to create admin: {str(e)}"}), 500
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        # Check if it's a database unique constraint violation for username
-        error_str = str(e)
-        if ("UniqueViolation" in error_str or "duplicate key" in error_str.lower()) and ("username" in error_str.lower() or "ix_managers_username" in error_str.lower()):
-            return jsonify({"error": f"Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to create admin")
         return jsonify({"error": f"Failed to create admin: {str(e)}"}), 500
 
 @bp.put("/<username>")
@@ -157,13 +159,15 @@ def edit_admin(username):
         return jsonify(updated_admin), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        # Database unique constraint violation for username
+        if is_duplicate_username_error(e.orig):
+            return jsonify({"error": "Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to update admin")
+        return jsonify({"error": f"Failed to update admin: {str(e)}"}), 500
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        # Check if it's a database unique constraint violation for username
-        error_str = str(e)
-        if ("UniqueViolation" in error_str or "duplicate key" in error_str.lower()) and ("username" in error_str.lower() or "ix_managers_username" in error_str.lower()):
-            return jsonify({"error": f"Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to update admin")
         return jsonify({"error": f"Failed to update admin: {str(e)}"}), 500
 
 @bp.get("/<username>")
@@ -193,7 +197,7 @@ def admin_login():
         return jsonify({"error": "Username and password required"}), 400
     
     # Find manager by username (will need tenant_id from manager record)
-    manager = get_manager_by_username(username)
+    manager, tenant_status = get_manager_with_tenant_status(username)
     if not manager:
         return jsonify({"error": "Invalid credentials"}), 401
     
@@ -209,11 +213,9 @@ def admin_login():
     if not tenant_id:
         return jsonify({"error": "Manager configuration error"}), 500
     
-    # Check tenant status
-    from ..models import Tenant
-    tenant = Tenant.query.get(tenant_id)
-    if tenant and tenant.status != 'active':
-        return jsonify({"error": f"Account is {tenant.status}. Please contact support."}), 403
+    # Check tenant status (loaded with the manager)
+    if tenant_status is not None and tenant_status != 'active':
+        return jsonify({"error": f"Account is {tenant_status}. Please contact support."}), 403
     
     # Get regions
     regions = manager.get("regions", [])
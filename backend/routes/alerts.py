@@ -1,11 +1,31 @@
 # backend/routes/alerts.py
 from flask import Blueprint, request, jsonify, g
 from backend.database import db
-from backend.models import get_alerts, mark_alert_read, create_alert
+from backend.models import get_alerts, count_alerts, mark_alert_read, create_alert
 from backend.auth import require_auth
 
 bp = Blueprint("alerts", __name__)
 
+# Upper bound on alerts returned per request
+MAX_ALERTS_LIMIT = 500
+
+_IS_READ_VALUES = {
+    'true': True, '1': True, 'yes': True,
+    'false': False, '0': False, 'no': False
+}
+
+
+def _parse_alert_params():
+    """
+    Parse list_alerts query params into (store_id, is_read, limit, cursor),
+    clamping limit to 1..MAX_ALERTS_LIMIT
+    """
+    store_id = request.args.get("store_id")
+    is_read = _IS_READ_VALUES.get((request.args.get("is_read") or '').lower())
+    limit = max(1, min(int(request.args.get("limit", 100)), MAX_ALERTS_LIMIT))
+    cursor = request.args.get("cursor")
+    return store_id, is_read, limit, int(cursor) if cursor else None
+
 
 @bp.get("/")
 @require_auth(roles=['manager'])
@@ -20,26 +40,24 @@ def list_alerts():
             return jsonify({"error": "Manager authentication required"}), 401
         
         # Get query parameters
-        store_id = request.args.get("store_id")
-        is_read = request.args.get("is_read")
-        limit = int(request.args.get("limit", 100))
-        
-        # Convert is_read string to boolean if provided
-        is_read_bool = None
-        if is_read is not None:
-            is_read_bool = is_read.lower() in ('true', '1', 'yes')
+        store_id, is_read, limit, cursor = _parse_alert_params()
         
         alerts = get_alerts(
             tenant_id=tenant_id,
             manager_username=manager_username,
             store_id=store_id,
-            is_read=is_read_bool,
-            limit=limit
+            is_read=is_read,
+            limit=limit,
+            before_id=cursor
         )
         
+        # A full page may have more behind it; pass next_cursor back as ?cursor= to continue
+        next_cursor = alerts[-1]['id'] if len(alerts) == limit else None
+        
         return jsonify({
             "alerts": alerts,
-            "total_count": len(alerts)
+            "total_count": len(alerts),
+            "next_cursor": next_cursor
         }), 200
         
     except Exception as e:
@@ -75,15 +93,14 @@ def get_unread_count():
         if not manager_username:
             return jsonify({"error": "Manager authentication required"}), 401
         
-        alerts = get_alerts(
+        unread_count = count_alerts(
             tenant_id=tenant_id,
             manager_username=manager_username,
-            is_read=False,
-            limit=1000  # Get all unread to count
+            is_read=False
         )
         
         return jsonify({
-            "unread_count": len(alerts)
+            "unread_count": unread_count
         }), 200
         
     except Exception as e:
@@ -6,16 +6,99 @@ Auto clock-out endpoint to clock out employees who forgot to clock out
 This endpoint should be called periodically (e.g., via cron job or scheduled task).
 Uses the centralized StoreAccessPolicy module for authoritative business rules.
 """
-from flask import Blueprint, jsonify, g, request
-from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from flask import Blueprint, g, request
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from sqlalchemy import Numeric, and_, case, cast, func, select, update
 from backend.database import db
 from backend.models import Store, TimeClock
 from backend.auth import require_auth
+from backend.utils.json_response import orjson_response
 from backend.utils.store_access_policy import StoreAccessPolicy
-from backend.utils.timezone_utils import now_et, today_start_utc_naive, et_to_utc_naive
+from backend.utils.timezone_utils import now_et, today_start_utc_naive, et_to_utc_naive, get_app_timezone
 
 bp = Blueprint("auto_clockout", __name__)
 
+APP_TZ = get_app_timezone()
+
+
+@lru_cache(maxsize=1024)
+def _auto_clockout_times_on(closing_time, store_timezone, store_date):
+    """
+    Auto clock-out time for a store schedule on a store-local date, as
+    (policy datetime, ET datetime, UTC naive), or None if the policy yields none.
+    
+    Only the store-local date of the reference time affects the result, so this is
+    keyed on (closing_time, store_timezone, store_date): stores sharing a schedule
+    hit the cache within a run and across runs on the same day.
+    """
+    tz, _ = StoreAccessPolicy.get_store_timezone(store_timezone)
+    # Any time on the store-local date works as the reference; midday avoids DST edges
+    reference_time = tz.localize(datetime.combine(store_date, dt_time(12, 0)))
+    
+    # Use policy module to get auto clock-out time (returns ET timezone-aware)
+    auto_clockout_dt = StoreAccessPolicy.auto_clock_out_at(
+        closing_time=closing_time,
+        store_timezone=store_timezone,
+        reference_time=reference_time
+    )
+    if not auto_clockout_dt:
+        return None
+    
+    # Ensure auto_clockout_dt is in ET (should already be from policy)
+    if auto_clockout_dt.tzinfo is None:
+        auto_clockout_et = APP_TZ.localize(auto_clockout_dt)
+    else:
+        auto_clockout_et = auto_clockout_dt.astimezone(APP_TZ)
+    
+    # Convert to UTC naive for database storage
+    return auto_clockout_dt, auto_clockout_et, et_to_utc_naive(auto_clockout_et)
+
+
+def _auto_clockout_times(closing_time, store_timezone, now_et_time):
+    """Auto clock-out times for a store schedule on the store-local date of now_et_time"""
+    tz, _ = StoreAccessPolicy.get_store_timezone(store_timezone)
+    return _auto_clockout_times_on(closing_time, store_timezone, now_et_time.astimezone(tz).date())
+
+
+def _hours_worked_expr(clock_out):
+    """SQL expression for hours between clock_in and the clock_out expression, rounded to 2 places"""
+    if db.engine.dialect.name == 'postgresql':
+        seconds = func.extract('epoch', clock_out - TimeClock.clock_in)
+        return func.round(cast(seconds / 3600.0, Numeric), 2)
+    hours = (func.julianday(clock_out) - func.julianday(TimeClock.clock_in)) * 24
+    return func.round(hours, 2)
+
+
+def _auto_clock_out_stores(tenant_id, clock_out_by_store, today_start):
+    """
+    Close every open entry clocked in today at the given stores with one UPDATE.
+    
+    clock_out_by_store maps store name -> UTC naive auto clock-out time; a CASE on
+    store_id picks each row's value. The clock_out IS NULL filter keeps it idempotent,
+    and the closed rows come back via RETURNING so no second SELECT is needed.
+    """
+    clock_out = case(clock_out_by_store, value=TimeClock.store_id)
+    return db.session.execute(
+        update(TimeClock)
+        .where(
+            TimeClock.tenant_id == tenant_id,
+            TimeClock.store_id.in_(list(clock_out_by_store)),
+            TimeClock.clock_in >= today_start,
+            TimeClock.clock_out.is_(None)
+        )
+        .values(
+            clock_out=clock_out,
+            clock_out_type="AUTO",
+            hours_worked=_hours_worked_expr(clock_out)
+        )
+        .returning(
+            TimeClock.employee_id, TimeClock.employee_name, TimeClock.store_id,
+            TimeClock.clock_in, TimeClock.hours_worked
+        ),
+        execution_options={'synchronize_session': False}
+    ).all()
+
 
 @bp.post("/auto-clockout")
 @require_auth(roles=['manager', 'admin', 'super-admin'])
@@ -33,92 +116,143 @@ def auto_clockout():
         # Use UTC naive for database queries
         today_start = today_start_utc_naive()
         
-        # Get all stores for this tenant
-        stores = Store.query.filter_by(tenant_id=tenant_id).all()
+        # Get the schedule of every store for this tenant (plain rows, no Store instances)
+        stores = db.session.execute(
+            select(Store.name, Store.closing_time, Store.timezone).where(
+                Store.tenant_id == tenant_id,
+                Store.closing_time.isnot(None)
+            )
+        ).all()
         
-        auto_clocked_out = []
+        # Work out which stores are past their auto clock-out time (no DB access)
+        due_stores = {}
         
-        for store in stores:
-            if not store.closing_time:
+        for store_name, closing_time, store_timezone in stores:
+            if not closing_time:
                 continue
             
             try:
-                # Use policy module to get auto clock-out time (returns ET timezone-aware)
-                auto_clockout_dt = StoreAccessPolicy.auto_clock_out_at(
-                    closing_time=store.closing_time,
-                    store_timezone=store.timezone,
-                    reference_time=now_et_time
-                )
-                
-                if not auto_clockout_dt:
+                auto_clockout_times = _auto_clockout_times(closing_time, store_timezone, now_et_time)
+                if not auto_clockout_times:
                     continue
-                
-                # Ensure auto_clockout_dt is in ET (should already be from policy)
-                if auto_clockout_dt.tzinfo is None:
-                    from backend.utils.timezone_utils import get_app_timezone
-                    auto_clockout_et = get_app_timezone().localize(auto_clockout_dt)
-                else:
-                    from backend.utils.timezone_utils import get_app_timezone
-                    auto_clockout_et = auto_clockout_dt.astimezone(get_app_timezone())
-                
-                # Convert to UTC naive for database storage
-                auto_clockout_naive = et_to_utc_naive(auto_clockout_et)
+                auto_clockout_dt, auto_clockout_et, auto_clockout_naive = auto_clockout_times
                 
                 # Only auto clock out if current time (ET) is past the auto clock-out time (ET)
                 if now_et_time >= auto_clockout_et:
-                    # Find all employees clocked in today at this store who haven't clocked out
-                    # and haven't been auto clocked out already
-                    active_entries = TimeClock.query.filter(
-                        TimeClock.tenant_id == tenant_id,
-                        TimeClock.store_id == store.name,
-                        TimeClock.clock_in >= today_start,
-                        TimeClock.clock_out == None
-                    ).all()
-                    
-                    for entry in active_entries:
-                        # Idempotency check: don't double-close
-                        if entry.clock_out is not None:
-                            continue
-                        
-                        # Auto clock out at the policy-defined time
-                        clock_in_time = entry.clock_in
-                        hours_worked = (auto_clockout_naive - clock_in_time).total_seconds() / 3600
-                        
-                        entry.clock_out = auto_clockout_naive
-                        entry.clock_out_type = "AUTO"
-                        entry.hours_worked = round(hours_worked, 2)
-                        
-                        auto_clocked_out.append({
-                            "employee_id": str(entry.employee_id),
-                            "employee_name": entry.employee_name,
-                            "store_id": store.name,
-                            "clock_in_time": clock_in_time.isoformat(),
-                            "clock_out_time": auto_clockout_naive.isoformat(),
-                            "hours_worked": round(hours_worked, 2),
-                            "auto_clockout_time": auto_clockout_dt.strftime('%H:%M') if auto_clockout_dt else None
-                        })
+                    due_stores[store_name] = (auto_clockout_dt, auto_clockout_naive)
             except (ValueError, AttributeError) as e:
                 # Skip stores with invalid closing time format
-                print(f"Warning: Skipping auto-clockout for store {store.name}: {e}")
+                print(f"Warning: Skipping auto-clockout for store {store_name}: {e}")
                 continue
         
+        auto_clocked_out = []
+        
+        if due_stores:
+            # Auto clock out everyone still clocked in today at the due stores in one statement
+            closed_entries = _auto_clock_out_stores(
+                tenant_id,
+                {name: naive for name, (_, naive) in due_stores.items()},
+                today_start
+            )
+            
+            for entry in closed_entries:
+                auto_clockout_dt, auto_clockout_naive = due_stores[entry.store_id]
+                auto_clocked_out.append({
+                    "employee_id": str(entry.employee_id),
+                    "employee_name": entry.employee_name,
+                    "store_id": entry.store_id,
+                    "clock_in_time": entry.clock_in,
+                    "clock_out_time": auto_clockout_naive,
+                    "hours_worked": entry.hours_worked,
+                    "auto_clockout_time": auto_clockout_dt.strftime('%H:%M') if auto_clockout_dt else None
+                })
+        
         if auto_clocked_out:
             db.session.commit()
-            return jsonify({
+            return orjson_response({
                 "success": True,
                 "auto_clocked_out_count": len(auto_clocked_out),
                 "auto_clocked_out": auto_clocked_out
-            }), 200
+            })
         else:
-            return jsonify({
+            return orjson_response({
                 "success": True,
                 "auto_clocked_out_count": 0,
                 "message": "No employees needed auto clock-out"
-            }), 200
+            })
             
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        return orjson_response({"error": str(e)}, 500)
+
+
+def run_auto_clockout_all_tenants():
+    """
+    Auto clock out due entries across all active tenants and commit.
+    
+    Shared by the all-tenants endpoint and the `flask auto-clockout` CLI command,
+    so the cron job can run it outside the web workers. Returns the report rows.
+    """
+    from backend.models import Tenant
+    
+    # Get current time in ET for business logic
+    now_et_time = now_et()
+    # Use UTC naive for database queries
+    today_start = today_start_utc_naive()
+    
+    # One query for the schedule of every store that still has open entries from today,
+    # across all active tenants
+    due_candidates = db.session.execute(
+        select(TimeClock.tenant_id, TimeClock.store_id, Store.closing_time, Store.timezone)
+        .distinct()
+        .join(Store, and_(Store.tenant_id == TimeClock.tenant_id, Store.name == TimeClock.store_id))
+        .join(Tenant, Tenant.id == TimeClock.tenant_id)
+        .where(
+            Tenant.status == 'active',
+            Store.closing_time.isnot(None),
+            TimeClock.clock_out.is_(None),
+            TimeClock.clock_in >= today_start
+        )
+    ).all()
+    
+    # Auto clock-out time per (tenant, store) for the stores that are due, grouped by tenant
+    due_by_tenant = {}
+    
+    for tenant_id, store_name, closing_time, store_timezone in due_candidates:
+        try:
+            auto_clockout_times = _auto_clockout_times(closing_time, store_timezone, now_et_time)
+            if not auto_clockout_times:
+                continue
+            _, auto_clockout_et, auto_clockout_naive = auto_clockout_times
+            
+            # Only auto clock out if current time (ET) is past the auto clock-out time (ET)
+            # Check within a 5-minute window to handle cron job timing
+            time_diff_et = (now_et_time - auto_clockout_et).total_seconds() / 60
+            if 0 <= time_diff_et <= 5:  # Within 5 minutes after auto clock-out time
+                due_by_tenant.setdefault(tenant_id, {})[store_name] = auto_clockout_naive
+        except (ValueError, AttributeError) as e:
+            # Skip stores with invalid closing time format
+            print(f"Warning: Skipping auto-clockout for store {store_name} (tenant {tenant_id}): {e}")
+    
+    total_auto_clocked_out = []
+    
+    # One guarded CASE UPDATE ... RETURNING per tenant, shared with the per-tenant endpoint
+    for tenant_id, clock_out_by_store in due_by_tenant.items():
+        for entry in _auto_clock_out_stores(tenant_id, clock_out_by_store, today_start):
+            total_auto_clocked_out.append({
+                "tenant_id": tenant_id,
+                "employee_id": str(entry.employee_id),
+                "employee_name": entry.employee_name,
+                "store_id": entry.store_id,
+                "clock_in_time": entry.clock_in,
+                "clock_out_time": clock_out_by_store[entry.store_id],
+                "hours_worked": entry.hours_worked
+            })
+    
+    if total_auto_clocked_out:
+        db.session.commit()
+    
+    return total_auto_clocked_out
 
 
 @bp.post("/auto-clockout/all-tenants")
@@ -126,108 +260,29 @@ def auto_clockout_all_tenants():
     """
     Auto clock-out endpoint for all tenants (for system-wide cron job).
     This endpoint should be called periodically (e.g., every 5 minutes).
+    Prefer the `flask auto-clockout` CLI command for cron, which does the same
+    work without tying up a web worker.
     
     Note: This endpoint does NOT require authentication as it's meant to be called
     by a system cron job. In production, you should secure this with an API key
     or restrict access by IP.
     """
     try:
-        from backend.models import Tenant
-        
-        # Get all active tenants
-        tenants = Tenant.query.filter_by(status='active').all()
-        
-        total_auto_clocked_out = []
-        
-        for tenant in tenants:
-            tenant_id = tenant.id
-            # Get current time in ET for business logic
-            now_et_time = now_et()
-            # Use UTC naive for database queries
-            today_start = today_start_utc_naive()
-            
-            # Get all stores for this tenant
-            stores = Store.query.filter_by(tenant_id=tenant_id).all()
-            
-            for store in stores:
-                if not store.closing_time:
-                    continue
-                
-                try:
-                    # Use policy module to get auto clock-out time (returns ET timezone-aware)
-                    auto_clockout_dt = StoreAccessPolicy.auto_clock_out_at(
-                        closing_time=store.closing_time,
-                        store_timezone=store.timezone,
-                        reference_time=now_et_time
-                    )
-                    
-                    if not auto_clockout_dt:
-                        continue
-                    
-                    # Ensure auto_clockout_dt is in ET (should already be from policy)
-                    if auto_clockout_dt.tzinfo is None:
-                        from backend.utils.timezone_utils import get_app_timezone
-                        auto_clockout_et = get_app_timezone().localize(auto_clockout_dt)
-                    else:
-                        from backend.utils.timezone_utils import get_app_timezone
-                        auto_clockout_et = auto_clockout_dt.astimezone(get_app_timezone())
-                    
-                    # Convert to UTC naive for database storage
-                    auto_clockout_naive = et_to_utc_naive(auto_clockout_et)
-                    
-                    # Only auto clock out if current time (ET) is past the auto clock-out time (ET)
-                    # Check within a 5-minute window to handle cron job timing
-                    time_diff_et = (now_et_time - auto_clockout_et).total_seconds() / 60
-                    if 0 <= time_diff_et <= 5:  # Within 5 minutes after auto clock-out time
-                        # Find all employees clocked in today at this store who haven't clocked out
-                        active_entries = TimeClock.query.filter(
-                            TimeClock.tenant_id == tenant_id,
-                            TimeClock.store_id == store.name,
-                            TimeClock.clock_in >= today_start,
-                            TimeClock.clock_out == None
-                        ).all()
-                        
-                        for entry in active_entries:
-                            # Idempotency check: don't double-close
-                            if entry.clock_out is not None:
-                                continue
-                            
-                            # Auto clock out at the policy-defined time
-                            clock_in_time = entry.clock_in
-                            hours_worked = (auto_clockout_naive - clock_in_time).total_seconds() / 3600
-                            
-                            entry.clock_out = auto_clockout_naive
-                            entry.clock_out_type = "AUTO"
-                            entry.hours_worked = round(hours_worked, 2)
-                            
-                            total_auto_clocked_out.append({
-                                "tenant_id": tenant_id,
-                                "employee_id": str(entry.employee_id),
-                                "employee_name": entry.employee_name,
-                                "store_id": store.name,
-                                "clock_in_time": clock_in_time.isoformat(),
-                                "clock_out_time": auto_clockout_naive.isoformat(),
-                                "hours_worked": round(hours_worked, 2)
-                            })
-                except (ValueError, AttributeError) as e:
-                    # Skip stores with invalid closing time format
-                    print(f"Warning: Skipping auto-clockout for store {store.name} (tenant {tenant_id}): {e}")
-                    continue
+        total_auto_clocked_out = run_auto_clockout_all_tenants()
         
         if total_auto_clocked_out:
-            db.session.commit()
-            return jsonify({
+            return orjson_response({
                 "success": True,
                 "auto_clocked_out_count": len(total_auto_clocked_out),
                 "auto_clocked_out": total_auto_clocked_out
-            }), 200
+            })
         else:
-            return jsonify({
+            return orjson_response({
                 "success": True,
                 "auto_clocked_out_count": 0,
                 "message": "No employees needed auto clock-out"
-            }), 200
+            })
             
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        return orjson_response({"error": str(e)}, 500)
@@ -1,10 +1,24 @@
 # backend/routes/billings.py
+from collections import defaultdict
+
 from flask import Blueprint, request, jsonify, g
-from ..models import get_billings_by_stores, update_billing_payment, get_stores, StoreBilling, get_all_managers, get_current_billing_month
+from ..models import get_billings_by_stores, update_billing_payment, get_stores, store_exists, StoreBilling, get_store_managers, get_current_billing_month
 from ..auth import require_auth
+from ..database import db
+from ..utils.json_response import orjson_response
 
 bp = Blueprint("billings", __name__)
 
+_BILL_TYPES = ('electricity', 'wifi', 'gas')
+_ALLOWED_BILL_TYPES = frozenset(_BILL_TYPES)
+
+# Billing entry for a store with no billing rows this month; shared and never mutated
+_EMPTY_BILLING = {
+    'electricity': {'paid': False, 'amount': 0},
+    'wifi': {'paid': False, 'amount': 0},
+    'gas': {'paid': False, 'amount': 0}
+}
+
 @bp.get("/")
 @require_auth(roles=['manager', 'super-admin', 'admin'])
 def get_billings():
@@ -18,43 +32,38 @@ def get_billings():
         if user_role == 'admin':
             admin_regions = g.current_user.get('regions', [])
             if not admin_regions:
-                return jsonify({
+                return orjson_response({
                     'stores': [],
                     'billings': {},
                     'billing_month': current_month
-                }), 200
+                })
             
             # Get all managers in admin's assigned regions
-            from ..models import Manager
-            managers = Manager.query.filter_by(tenant_id=tenant_id).filter(
-                Manager.is_super_admin == False,
-                Manager.is_admin == False,
-                Manager.location.in_(admin_regions)
-            ).all()
+            managers = get_store_managers(tenant_id, regions=admin_regions)
             
-            manager_usernames = [m.username for m in managers]
+            manager_usernames = [m['username'] for m in managers]
             if not manager_usernames:
-                return jsonify({
+                return orjson_response({
                     'stores': [],
                     'billings': {},
                     'billing_month': current_month
-                }), 200
+                })
             
-            # Get stores for these managers
+            # Get store names for these managers
             from ..models import Store
-            stores = Store.query.filter_by(tenant_id=tenant_id).filter(
+            store_names = [name for (name,) in db.session.query(Store.name).filter(
+                Store.tenant_id == tenant_id,
                 Store.manager_username.in_(manager_usernames)
-            ).all()
-            store_names = [store.name for store in stores]
+            )]
         elif user_role == 'manager':
             # Manager sees only their own stores
             manager_username = g.current_user.get('username')
             if not manager_username:
-                return jsonify({
+                return orjson_response({
                     'stores': [],
                     'billings': {},
                     'billing_month': current_month
-                }), 200
+                })
             
             stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
             store_names = [store["name"] for store in stores]
@@ -63,32 +72,34 @@ def get_billings():
             stores = get_stores(tenant_id=tenant_id)
             store_names = [store["name"] for store in stores]
         
-        # Get billings grouped by store (for current month)
-        all_billings = get_billings_by_stores(tenant_id, billing_month=current_month)
+        # Get billings grouped by store (for current month), only for the stores the user can see
+        all_billings = get_billings_by_stores(tenant_id, billing_month=current_month, store_names=store_names)
         
-        # Filter billings to only include stores the user has access to
+        # Fill in stores that have no billing rows yet
         billings = {}
         for store_name in store_names:
             if store_name in all_billings:
                 billings[store_name] = all_billings[store_name]
             else:
                 # Ensure all stores have billing entries (even if empty)
-                billings[store_name] = {
-                    'electricity': {'paid': False, 'amount': 0},
-                    'wifi': {'paid': False, 'amount': 0},
-                    'gas': {'paid': False, 'amount': 0}
-                }
+                billings[store_name] = _EMPTY_BILLING
         
-        return jsonify({
+        response = orjson_response({
             'stores': store_names,
             'billings': billings,
             'billing_month': current_month
-        }), 200
+        })
+        # Let clients revalidate with If-None-Match; an unchanged body is answered with a 304.
+        # no-cache (not max-age) so a payment is visible on the next load.
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.add_etag()
+        return response.make_conditional(request)
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Failed to get billings: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to get billings: {str(e)}"}, 500)
 
 
 @bp.post("/pay")
@@ -108,7 +119,7 @@ def pay_billing():
         if not bill_type:
             return jsonify({"error": "bill_type is required"}), 400
         
-        if bill_type.lower() not in ['electricity', 'wifi', 'gas']:
+        if bill_type.lower() not in _ALLOWED_BILL_TYPES:
             return jsonify({"error": "bill_type must be 'electricity', 'wifi', or 'gas'"}), 400
         
         amount = data.get("amount")
@@ -132,15 +143,11 @@ def pay_billing():
             if not manager_username:
                 return jsonify({"error": "Manager username not found"}), 400
             
-            stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
-            store_names = [store["name"] for store in stores]
-            if store_id not in store_names:
+            if not store_exists(tenant_id, store_id, manager_username=manager_username):
                 return jsonify({"error": f"Store '{store_id}' not found or access denied"}), 404
         else:
             # Super-admin can pay for any store in tenant
-            stores = get_stores(tenant_id=tenant_id)
-            store_names = [store["name"] for store in stores]
-            if store_id not in store_names:
+            if not store_exists(tenant_id, store_id):
                 return jsonify({"error": f"Store '{store_id}' not found"}), 404
         
         # Update billing payment
@@ -169,71 +176,57 @@ def get_managers_billings():
         if user_role == 'admin':
             admin_regions = g.current_user.get('regions', [])
             if not admin_regions:
-                return jsonify({
+                return orjson_response({
                     'managers': [],
                     'billing_month': current_month
-                }), 200
+                })
             
             # Get all managers in admin's assigned regions
-            from ..models import Manager
-            managers_query = Manager.query.filter_by(tenant_id=tenant_id).filter(
-                Manager.is_super_admin == False,
-                Manager.is_admin == False,
-                Manager.location.in_(admin_regions)
-            ).all()
-            managers = [m.to_dict() for m in managers_query]
+            managers = get_store_managers(tenant_id, regions=admin_regions)
         else:
             # Super-admin sees all managers (exclude super admin and admins)
-            all_managers = get_all_managers(tenant_id=tenant_id)
-            managers = [m for m in all_managers if not m.get('is_super_admin', False) and not m.get('is_admin', False)]
+            managers = get_store_managers(tenant_id)
+        
+        if not managers:
+            return orjson_response({
+                'managers': [],
+                'billing_month': current_month
+            })
         
-        # Get billings for all stores
-        all_billings = get_billings_by_stores(tenant_id, billing_month=current_month)
+        # Fetch the stores of all listed managers in one query and bucket them by manager
+        from ..models import Store
+        manager_usernames = [m['username'] for m in managers]
+        stores_by_manager = defaultdict(list)
+        store_rows = db.session.query(Store.name, Store.manager_username).filter(
+            Store.tenant_id == tenant_id,
+            Store.manager_username.in_(manager_usernames)
+        ).all()
+        for store_name, store_manager in store_rows:
+            stores_by_manager[store_manager].append(store_name)
         
-        # If admin, filter billings to only stores in their regions
-        if user_role == 'admin':
-            # Get all store names for managers in admin's regions
-            from ..models import Store
-            admin_store_names = set()
-            for manager in managers:
-                manager_stores = Store.query.filter_by(
-                    tenant_id=tenant_id,
-                    manager_username=manager['username']
-                ).all()
-                admin_store_names.update([s.name for s in manager_stores])
-            
-            # Filter billings to only include stores in admin's regions
-            filtered_billings = {
-                store_name: billing 
-                for store_name, billing in all_billings.items() 
-                if store_name in admin_store_names
-            }
-            all_billings = filtered_billings
+        # Get billings for the listed managers' stores only (for admins, the stores in their regions)
+        all_billings = get_billings_by_stores(
+            tenant_id,
+            billing_month=current_month,
+            store_names=[name for names in stores_by_manager.values() for name in names]
+        )
         
         # Group stores by manager and attach billing info
         managers_with_billings = []
         for manager in managers:
             manager_username = manager['username']
             
-            # Get stores for this manager
-            stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
-            
             # Get billing info for each store
             stores_with_billings = []
             total_paid = 0
             total_unpaid = 0
             
-            for store in stores:
-                store_name = store['name']
-                store_billing = all_billings.get(store_name, {
-                    'electricity': {'paid': False, 'amount': 0},
-                    'wifi': {'paid': False, 'amount': 0},
-                    'gas': {'paid': False, 'amount': 0}
-                })
+            for store_name in stores_by_manager.get(manager_username, []):
+                store_billing = all_billings.get(store_name, _EMPTY_BILLING)
                 
-                # Calculate totals
-                for bill_type in ['electricity', 'wifi', 'gas']:
-                    bill = store_billing.get(bill_type, {'paid': False, 'amount': 0})
+                # Calculate totals (every store billing carries all bill types)
+                for bill_type in _BILL_TYPES:
+                    bill = store_billing[bill_type]
                     if bill['paid']:
                         total_paid += bill['amount']
                     else:
@@ -256,15 +249,15 @@ def get_managers_billings():
                 'unpaid_bills_count': total_unpaid
             })
         
-        return jsonify({
+        return orjson_response({
             'managers': managers_with_billings,
             'billing_month': current_month
-        }), 200
+        })
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Failed to get managers billings: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to get managers billings: {str(e)}"}, 500)
 
 
 @bp.get("/manager/<manager_username>")
@@ -280,59 +273,55 @@ def get_manager_billings(manager_username):
         if user_role == 'admin':
             admin_regions = g.current_user.get('regions', [])
             if not admin_regions:
-                return jsonify({"error": "No regions assigned"}), 403
-            
-            # Get manager and check if their location is in admin's regions
-            from ..models import get_manager_by_username
-            manager = get_manager_by_username(manager_username, tenant_id=tenant_id)
-            if not manager:
-                return jsonify({"error": "Manager not found"}), 404
-            
+                return orjson_response({"error": "No regions assigned"}, 403)
+        
+        # Get manager once; it is needed for the region check and the response
+        from ..models import get_manager_by_username
+        manager = get_manager_by_username(manager_username, tenant_id=tenant_id)
+        if not manager:
+            return orjson_response({"error": "Manager not found"}, 404)
+        
+        if user_role == 'admin':
+            # Check if the manager's location is in admin's regions
             manager_location = manager.get('location', '').strip()
             if not manager_location or manager_location not in admin_regions:
-                return jsonify({"error": "Access denied. Manager not in your assigned regions."}), 403
+                return orjson_response({"error": "Access denied. Manager not in your assigned regions."}, 403)
         
         # Get stores for this manager
         stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
         
         if not stores:
-            return jsonify({"error": "No stores found for this manager"}), 404
+            return orjson_response({"error": "No stores found for this manager"}, 404)
         
         # Get billings for these stores
-        all_billings = get_billings_by_stores(tenant_id, billing_month=current_month)
+        all_billings = get_billings_by_stores(
+            tenant_id,
+            billing_month=current_month,
+            store_names=[store['name'] for store in stores]
+        )
         
         # Format store billings
         stores_with_billings = []
         for store in stores:
             store_name = store['name']
-            store_billing = all_billings.get(store_name, {
-                'electricity': {'paid': False, 'amount': 0},
-                'wifi': {'paid': False, 'amount': 0},
-                'gas': {'paid': False, 'amount': 0}
-            })
+            store_billing = all_billings.get(store_name, _EMPTY_BILLING)
             
             stores_with_billings.append({
                 'name': store_name,
                 'billing': store_billing
             })
         
-        # Get manager info
-        from ..models import get_manager_by_username
-        manager = get_manager_by_username(manager_username, tenant_id=tenant_id)
-        if not manager:
-            return jsonify({"error": "Manager not found"}), 404
-        
-        return jsonify({
+        return orjson_response({
             'manager': {
                 'name': manager['name'],
                 'username': manager['username']
             },
             'stores': stores_with_billings,
             'billing_month': current_month
-        }), 200
+        })
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Failed to get manager billings: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to get manager billings: {str(e)}"}, 500)
 
@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify, g
 from ..models import get_employees, create_employee, delete_employee, update_employee
 from ..auth import require_auth
+from ..utils.json_response import orjson_response
 
 bp = Blueprint("employees", __name__)
 
@@ -11,33 +12,30 @@ def list_employees():
     tenant_id = g.tenant_id
     store_id = request.args.get("store_id")
     employees = get_employees(tenant_id=tenant_id, store_id=store_id)
-    return jsonify(employees)
+    return orjson_response(employees)
 
 
 @bp.get("/active-count")
 @require_auth()
 def get_active_count():
     """Get count of employees currently clocked in (active)"""
-    from datetime import datetime
+    from ..database import db
     from ..models import TimeClock
     from backend.utils.timezone_utils import today_start_utc_naive
     
     tenant_id = g.tenant_id
     today_start = today_start_utc_naive()
     
-    # Get all employees clocked in today who haven't clocked out
-    active_entries = TimeClock.query.filter(
+    # Distinct IDs of employees clocked in today who haven't clocked out (de-duplicated in SQL)
+    active_employee_ids = [employee_id for (employee_id,) in db.session.query(TimeClock.employee_id).filter(
         TimeClock.tenant_id == tenant_id,
         TimeClock.clock_in >= today_start,
         TimeClock.clock_out == None
-    ).all()
-    
-    # Get unique employee IDs
-    active_employee_ids = set(entry.employee_id for entry in active_entries)
+    ).distinct()]
     
     return jsonify({
         "active_count": len(active_employee_ids),
-        "active_employee_ids": list(active_employee_ids)
+        "active_employee_ids": active_employee_ids
     }), 200
 
 @bp.post("/")
@@ -55,16 +53,6 @@ def add_employee():
         tenant_id = g.tenant_id
         phone_number = data.get("phone_number")
         
-        # Check for duplicate phone number if provided
-        if phone_number and phone_number.strip():
-            from ..models import Employee
-            existing_employee = Employee.query.filter_by(
-                tenant_id=tenant_id,
-                phone_number=phone_number.strip()
-            ).first()
-            if existing_employee:
-                return jsonify({"error": f"An employee with phone number {phone_number.strip()} already exists."}), 400
-        
         emp_id = create_employee(
             tenant_id=tenant_id,
             store_id=data.get("store_id"),
@@ -91,26 +79,12 @@ def edit_employee(employee_id):
             return jsonify({"error": "Request body is required"}), 400
         
         tenant_id = g.tenant_id
-        
-        # Verify employee belongs to this tenant
-        from ..models import Employee
-        employee = Employee.query.get(int(employee_id)) if employee_id.isdigit() else None
-        if not employee or employee.tenant_id != tenant_id:
+        if not employee_id.isdigit():
             return jsonify({"error": "Employee not found"}), 404
         
         phone_number = data.get("phone_number")
         hourly_pay = data.get("hourly_pay")
         
-        # Check for duplicate phone number if phone_number is being updated and is different
-        if phone_number and phone_number.strip():
-            from ..models import Employee
-            existing_employee = Employee.query.filter_by(
-                tenant_id=tenant_id,
-                phone_number=phone_number.strip()
-            ).first()
-            if existing_employee and str(existing_employee.id) != str(employee_id):
-                return jsonify({"error": f"An employee with phone number {phone_number.strip()} already exists."}), 400
-        
         # Validate hourly_pay if provided
         if hourly_pay is not None:
             try:
@@ -120,19 +94,22 @@ def edit_employee(employee_id):
             except (ValueError, TypeError):
                 return jsonify({"error": "Invalid hourly pay value"}), 400
         
-        success = update_employee(
+        # The tenant ownership check happens in the UPDATE itself
+        updated_employee = update_employee(
             employee_id=employee_id,
             tenant_id=tenant_id,
             phone_number=phone_number,
             hourly_pay=hourly_pay
         )
         
-        if success:
+        if updated_employee:
             # Return updated employee data
-            employee = Employee.query.get(int(employee_id))
-            return jsonify({"success": True, "employee": employee.to_dict()}), 200
+            return jsonify({"success": True, "employee": updated_employee}), 200
         else:
-            return jsonify({"error": "Failed to update employee"}), 500
+            return jsonify({"error": "Employee not found"}), 404
+    except ValueError as e:
+        # Handle duplicate phone number error from update_employee
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         import traceback
         traceback.print_exc()
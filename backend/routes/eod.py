@@ -1,19 +1,114 @@
 # backend/routes/eod.py
 from flask import Blueprint, request, jsonify, g
+import logging
 from datetime import datetime, timedelta
-from ..models import get_eods, create_eod, get_stores, EOD
+from sqlalchemy import and_
+from ..models import get_eods_json, create_eod, create_eods, get_stores, EOD, Manager, Store
 from ..database import db
 from ..auth import require_auth
+from ..utils.json_response import orjson_response, json_rows
+from backend.utils.timezone_utils import now_et
 
 bp = Blueprint("eod", __name__)
+logger = logging.getLogger(__name__)
+
+# Numeric EOD fields by parser; over_short is the only one allowed to be negative
+_EOD_FLOAT_FIELDS = (
+    "cash_amount", "credit_amount", "card1_amount", "qpay_amount", "accessories_amount",
+    "magenta_amount", "over_short", "total1", "total_bills"
+)
+_EOD_INT_FIELDS = (
+    "boxes_count", "inventory_sold", "denom_100_count", "denom_50_count", "denom_20_count",
+    "denom_10_count", "denom_5_count", "denom_1_count"
+)
+_EOD_NEGATIVE_OK = frozenset({"over_short"})
+# Amount columns summed into each cash/card report cell
+_CASH_REPORT_COLUMNS = (EOD.cash_amount, EOD.credit_amount, EOD.qpay_amount)
+_CARD_REPORT_COLUMNS = (EOD.credit_amount, EOD.card1_amount)
+# Upper bound on reports per /bulk request, so one request can't hold a huge transaction
+_EOD_BULK_LIMIT = 500
+
+
+def _safe_float(value, default=0):
+    """Parse a float, treating empty values as default and unparseable ones as 0"""
+    try:
+        return float(value or default)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _safe_int(value, default=0):
+    """Parse an int, treating empty or unparseable values as default"""
+    try:
+        return int(value or default)
+    except (ValueError, TypeError):
+        return default
+
+
+def _parse_eod_submission(data):
+    """
+    Validate one submitted EOD report and parse its fields.
+    
+    Returns (fields, None), where fields are the create_eod keyword arguments
+    (everything but tenant_id), or (None, error_message) if the report is invalid.
+    """
+    if not isinstance(data, dict):
+        return None, "Each EOD report must be a JSON object"
+    
+    store_id = data.get("store_id")
+    if not store_id:
+        return None, "store_id is required"
+    
+    report_date = data.get("report_date")
+    if not report_date:
+        return None, "report_date is required"
+    
+    # Parse every numeric field with its table-driven parser
+    amounts = {field: _safe_float(data.get(field, 0)) for field in _EOD_FLOAT_FIELDS}
+    amounts.update({field: _safe_int(data.get(field, 0)) for field in _EOD_INT_FIELDS})
+    
+    # Validate non-negative values (except over_short which can be negative)
+    if any(value < 0 for field, value in amounts.items() if field not in _EOD_NEGATIVE_OK):
+        return None, "All amounts and counts must be non-negative (except Over/Short)"
+    
+    # Debug logging (formatted lazily, skipped unless DEBUG is enabled)
+    logger.debug(
+        "EOD Submission received: cash=%s, credit=%s, card1=%s, qpay=%s, boxes=%s, accessories=%s, "
+        "magenta=%s, inventory_sold=%s, over_short=%s, total1=%s",
+        amounts["cash_amount"], amounts["credit_amount"], amounts["card1_amount"], amounts["qpay_amount"],
+        amounts["boxes_count"], amounts["accessories_amount"], amounts["magenta_amount"],
+        amounts["inventory_sold"], amounts["over_short"], amounts["total1"]
+    )
+    
+    return {
+        "store_id": store_id,
+        "report_date": report_date,
+        "notes": data.get("notes"),
+        "submitted_by": data.get("submitted_by"),
+        **amounts
+    }, None
+
+
+def _resolve_admin_store_names(tenant_id, regions):
+    """Names of the stores run by regular managers located in the given regions (one JOIN query)"""
+    rows = db.session.query(Store.name).join(
+        Manager,
+        and_(Manager.tenant_id == Store.tenant_id, Manager.username == Store.manager_username)
+    ).filter(
+        Store.tenant_id == tenant_id,
+        Manager.is_super_admin == False,
+        Manager.is_admin == False,
+        Manager.location.in_(regions)
+    ).all()
+    return [name for (name,) in rows]
 
 @bp.get("/")
 @require_auth()
 def list_eod():
     tenant_id = g.tenant_id
     store_id = request.args.get("store_id")
-    reports = get_eods(tenant_id=tenant_id, store_id=store_id)
-    return jsonify(reports)
+    reports = get_eods_json(tenant_id=tenant_id, store_id=store_id)
+    return orjson_response(json_rows(reports))
 
 @bp.post("/")
 @require_auth()
@@ -23,96 +118,12 @@ def add_eod():
         if not data:
             return jsonify({"error": "Request body is required"}), 400
         
-        store_id = data.get("store_id")
-        if not store_id:
-            return jsonify({"error": "store_id is required"}), 400
-        
-        report_date = data.get("report_date")
-        if not report_date:
-            return jsonify({"error": "report_date is required"}), 400
-        
-        # Extract values with explicit defaults and validation
-        def safe_float(value, default=0):
-            try:
-                return float(value or default)
-            except (ValueError, TypeError):
-                return 0
-        
-        def safe_int(value, default=0):
-            try:
-                return int(value or default)
-            except (ValueError, TypeError):
-                return default
-        
-        try:
-            cash_amount = safe_float(data.get("cash_amount", 0))
-            credit_amount = safe_float(data.get("credit_amount", 0))
-            card1_amount = safe_float(data.get("card1_amount", 0))
-            qpay_amount = safe_float(data.get("qpay_amount", 0))
-            boxes_count = safe_int(data.get("boxes_count", 0))
-            accessories_amount = safe_float(data.get("accessories_amount", 0))
-            magenta_amount = safe_float(data.get("magenta_amount", 0))
-            inventory_sold = safe_int(data.get("inventory_sold", 0))
-            over_short = safe_float(data.get("over_short", 0))  # Can be negative
-            total1 = safe_float(data.get("total1", 0))
-            
-            # Denominations
-            denom_100_count = safe_int(data.get("denom_100_count", 0))
-            denom_100_total = safe_float(data.get("denom_100_total", 0))
-            denom_50_count = safe_int(data.get("denom_50_count", 0))
-            denom_50_total = safe_float(data.get("denom_50_total", 0))
-            denom_20_count = safe_int(data.get("denom_20_count", 0))
-            denom_20_total = safe_float(data.get("denom_20_total", 0))
-            denom_10_count = safe_int(data.get("denom_10_count", 0))
-            denom_10_total = safe_float(data.get("denom_10_total", 0))
-            denom_5_count = safe_int(data.get("denom_5_count", 0))
-            denom_5_total = safe_float(data.get("denom_5_total", 0))
-            denom_1_count = safe_int(data.get("denom_1_count", 0))
-            denom_1_total = safe_float(data.get("denom_1_total", 0))
-            total_bills = safe_float(data.get("total_bills", 0))
-            
-            # Validate non-negative values (except over_short which can be negative)
-            if cash_amount < 0 or credit_amount < 0 or card1_amount < 0 or qpay_amount < 0 or boxes_count < 0 or accessories_amount < 0 or magenta_amount < 0 or inventory_sold < 0 or total1 < 0:
-                return jsonify({"error": "All amounts and counts must be non-negative (except Over/Short)"}), 400
-        except (ValueError, TypeError) as e:
-            return jsonify({"error": f"Invalid numeric value: {str(e)}"}), 400
-        
-        # Debug logging
-        print(f"EOD Submission received: cash={cash_amount}, credit={credit_amount}, card1={card1_amount}, "
-              f"qpay={qpay_amount}, boxes={boxes_count}, accessories={accessories_amount}, "
-              f"magenta={magenta_amount}, inventory_sold={inventory_sold}, over_short={over_short}, total1={total1}")
+        fields, error = _parse_eod_submission(data)
+        if error:
+            return jsonify({"error": error}), 400
         
         tenant_id = g.tenant_id
-        eod_id = create_eod(
-            tenant_id=tenant_id,
-            store_id=store_id,
-            report_date=report_date,
-            notes=data.get("notes"),
-            cash_amount=cash_amount,
-            credit_amount=credit_amount,
-            card1_amount=card1_amount,
-            qpay_amount=qpay_amount,
-            boxes_count=boxes_count,
-            accessories_amount=accessories_amount,
-            magenta_amount=magenta_amount,
-            inventory_sold=inventory_sold,
-            over_short=over_short,
-            total1=total1,
-            denom_100_count=denom_100_count,
-            denom_100_total=denom_100_total,
-            denom_50_count=denom_50_count,
-            denom_50_total=denom_50_total,
-            denom_20_count=denom_20_count,
-            denom_20_total=denom_20_total,
-            denom_10_count=denom_10_count,
-            denom_10_total=denom_10_total,
-            denom_5_count=denom_5_count,
-            denom_5_total=denom_5_total,
-            denom_1_count=denom_1_count,
-            denom_1_total=denom_1_total,
-            total_bills=total_bills,
-            submitted_by=data.get("submitted_by")
-        )
+        eod_id = create_eod(tenant_id=tenant_id, **fields)
         
         return jsonify({"id": eod_id}), 201
     except Exception as e:
@@ -120,6 +131,142 @@ def add_eod():
         traceback.print_exc()
         return jsonify({"error": f"Failed to create EOD report: {str(e)}"}), 500
 
+@bp.post("/bulk")
+@require_auth()
+def add_eod_bulk():
+    """Create many EOD reports (e.g. an offline client's backlog) in one transaction"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, list) or not data:
+            return jsonify({"error": "Request body must be a non-empty list of EOD reports"}), 400
+        if len(data) > _EOD_BULK_LIMIT:
+            return jsonify({"error": f"At most {_EOD_BULK_LIMIT} EOD reports can be submitted at once"}), 400
+        
+        reports = []
+        report_indexes = []
+        failed = []
+        for index, item in enumerate(data):
+            fields, error = _parse_eod_submission(item)
+            if error:
+                failed.append({"index": index, "error": error})
+            else:
+                reports.append(fields)
+                report_indexes.append(index)
+        
+        # ids lines up with the submitted list; invalid items get null
+        ids = [None] * len(data)
+        if reports:
+            created_ids = create_eods(tenant_id=g.tenant_id, reports=reports)
+            for index, eod_id in zip(report_indexes, created_ids):
+                ids[index] = eod_id
+        return jsonify({"ids": ids, "failed": failed}), 201 if reports else 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Failed to create EOD reports: {str(e)}"}), 500
+
+def _build_eod_report(columns, total_key):
+    """
+    Build an EOD amount report for the current request, grouped by date and store.
+    
+    columns are the EOD amount columns to report; each cell holds those amounts
+    (keyed by column name) plus their sum under total_key. Dates come from the
+    start_date/end_date query params (default: the last 7 days in ET) and stores
+    from the caller's role (admin regions, a manager_username filter, or all).
+    """
+    # Snapshot request context once; everything below uses these locals
+    tenant_id = g.tenant_id
+    user = g.current_user
+    user_role = user.get('role')
+    admin_regions = user.get('regions', [])
+    manager_username = request.args.get("manager_username")
+    
+    # Get date range from query params
+    start_date_param = request.args.get("start_date")
+    end_date_param = request.args.get("end_date")
+    
+    if start_date_param:
+        start_date = datetime.strptime(start_date_param, "%Y-%m-%d").date()
+    else:
+        # Use ET time for date calculations
+        start_date = (now_et() - timedelta(days=6)).date()  # 7 days including today
+    
+    if end_date_param:
+        end_date = datetime.strptime(end_date_param, "%Y-%m-%d").date()
+    else:
+        # Use ET time for date calculations
+        end_date = now_et().date()
+    
+    # Get stores for this tenant, optionally filtered by manager or admin regions
+    # If admin, filter stores by managers in assigned regions
+    if user_role == 'admin':
+        store_names = _resolve_admin_store_names(tenant_id, admin_regions) if admin_regions else []
+        if not store_names:
+            # Admin with no regions, or no managers (or no stores) in assigned regions, sees no stores
+            return {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "stores": [],
+                "data": {}
+            }
+    elif manager_username:
+        # Filter by specific manager
+        stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
+        store_names = [store["name"] for store in stores]
+    else:
+        # Super-admin sees all stores
+        stores = get_stores(tenant_id=tenant_id)
+        store_names = [store["name"] for store in stores]
+    
+    # Get EOD reports for the date range
+    start_date_str = start_date.isoformat()
+    end_date_str = end_date.isoformat()
+    
+    # Only the columns the report needs, oldest first so the latest EOD of a store/day wins
+    eod_query = db.session.query(
+        EOD.report_date, EOD.store_id, *columns
+    ).filter(
+        EOD.tenant_id == tenant_id,
+        EOD.report_date >= start_date_str,
+        EOD.report_date <= end_date_str
+    ).order_by(EOD.id)
+    
+    # If the store list is scoped (admin regions or a specific manager), only fetch those stores' EODs
+    if user_role == 'admin' or manager_username:
+        eod_query = eod_query.filter(EOD.store_id.in_(store_names))
+    
+    eods = eod_query.all()
+    
+    # Group data by date and store
+    keys = [column.key for column in columns]
+    
+    # Initialize all dates in range with empty data (date.isoformat() is YYYY-MM-DD);
+    # every cell is a copy of one zeroed template
+    num_days = (end_date - start_date).days + 1
+    date_strs = [(start_date + timedelta(days=i)).isoformat() for i in range(num_days)]
+    template = dict.fromkeys((*keys, total_key), 0)
+    report_data = {
+        date_str: {store_name: template.copy() for store_name in store_names}
+        for date_str in date_strs
+    }
+    
+    # Fill in actual EOD data
+    for date_str, store_name, *amounts in eods:
+        if date_str in report_data and store_name in report_data[date_str]:
+            amounts = [float(amount or 0) for amount in amounts]
+            cell = dict(zip(keys, amounts))
+            cell[total_key] = sum(amounts)
+            report_data[date_str][store_name] = cell
+    
+    # Format response
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "stores": store_names,
+        "data": report_data
+    }
+
+
 @bp.get("/cash-report")
 @require_auth(roles=['super-admin', 'admin'])
 def get_cash_report():
@@ -132,130 +279,8 @@ def get_cash_report():
     - end_date: End date (YYYY-MM-DD), defaults to today
     """
     try:
-        tenant_id = g.tenant_id
-        
-        # Get date range from query params
-        start_date_param = request.args.get("start_date")
-        end_date_param = request.args.get("end_date")
-        
-        if start_date_param:
-            start_date = datetime.strptime(start_date_param, "%Y-%m-%d").date()
-        else:
-            # Use ET time for date calculations
-            from backend.utils.timezone_utils import now_et
-            start_date = (now_et() - timedelta(days=6)).date()  # 7 days including today
-        
-        if end_date_param:
-            end_date = datetime.strptime(end_date_param, "%Y-%m-%d").date()
-        else:
-            # Use ET time for date calculations
-            from backend.utils.timezone_utils import now_et
-            end_date = now_et().date()
-        
-        # Get stores for this tenant, optionally filtered by manager or admin regions
-        user_role = g.current_user.get('role')
-        manager_username = request.args.get("manager_username")
-        
-        # If admin, filter stores by managers in assigned regions
-        if user_role == 'admin':
-            admin_regions = g.current_user.get('regions', [])
-            if not admin_regions:
-                # Admin with no regions sees no stores
-                return jsonify({
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
-                    "stores": [],
-                    "data": {}
-                }), 200
-            
-            # Get all managers in admin's assigned regions
-            from ..models import Manager
-            managers = Manager.query.filter_by(tenant_id=tenant_id).filter(
-                Manager.is_super_admin == False,
-                Manager.is_admin == False,
-                Manager.location.in_(admin_regions)
-            ).all()
-            
-            manager_usernames = [m.username for m in managers]
-            if not manager_usernames:
-                # No managers in assigned regions
-                return jsonify({
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
-                    "stores": [],
-                    "data": {}
-                }), 200
-            
-            # Get stores for these managers
-            from ..models import Store
-            stores = Store.query.filter_by(tenant_id=tenant_id).filter(
-                Store.manager_username.in_(manager_usernames)
-            ).all()
-            store_names = [store.name for store in stores]
-        elif manager_username:
-            # Filter by specific manager
-            stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
-            store_names = [store["name"] for store in stores]
-        else:
-            # Super-admin sees all stores
-            stores = get_stores(tenant_id=tenant_id)
-            store_names = [store["name"] for store in stores]
-        
-        # Get EOD reports for the date range, filtered by store names if admin
-        start_date_str = start_date.isoformat()
-        end_date_str = end_date.isoformat()
-        
-        eod_query = EOD.query.filter(
-            EOD.tenant_id == tenant_id,
-            EOD.report_date >= start_date_str,
-            EOD.report_date <= end_date_str
-        )
-        
-        # If admin, only show EODs for stores in their regions
-        if user_role == 'admin' and store_names:
-            eod_query = eod_query.filter(EOD.store_id.in_(store_names))
-        
-        eods = eod_query.all()
-        
-        # Group data by date and store
-        report_data = {}
-        
-        # Initialize all dates in range with empty data
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            report_data[date_str] = {}
-            for store_name in store_names:
-                report_data[date_str][store_name] = {
-                    "cash_amount": 0,
-                    "credit_amount": 0,
-                    "qpay_amount": 0,
-                    "total": 0
-                }
-            current_date += timedelta(days=1)
-        
-        # Fill in actual EOD data
-        for eod in eods:
-            date_str = eod.report_date
-            store_name = eod.store_id
-            
-            if date_str in report_data and store_name in report_data[date_str]:
-                report_data[date_str][store_name] = {
-                    "cash_amount": float(eod.cash_amount or 0),
-                    "credit_amount": float(eod.credit_amount or 0),
-                    "qpay_amount": float(eod.qpay_amount or 0),
-                    "total": float(eod.cash_amount or 0) + float(eod.credit_amount or 0) + float(eod.qpay_amount or 0)
-                }
-        
-        # Format response
-        result = {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "stores": store_names,
-            "data": report_data
-        }
-        
-        return jsonify(result), 200
+        result = _build_eod_report(_CASH_REPORT_COLUMNS, "total")
+        return orjson_response(result)
         
     except Exception as e:
         import traceback
@@ -275,132 +300,8 @@ def get_card_report():
     - end_date: End date (YYYY-MM-DD), defaults to today
     """
     try:
-        tenant_id = g.tenant_id
-        
-        # Get date range from query params
-        start_date_param = request.args.get("start_date")
-        end_date_param = request.args.get("end_date")
-        
-        if start_date_param:
-            start_date = datetime.strptime(start_date_param, "%Y-%m-%d").date()
-        else:
-            # Use ET time for date calculations
-            from backend.utils.timezone_utils import now_et
-            start_date = (now_et() - timedelta(days=6)).date()  # 7 days including today
-        
-        if end_date_param:
-            end_date = datetime.strptime(end_date_param, "%Y-%m-%d").date()
-        else:
-            # Use ET time for date calculations
-            from backend.utils.timezone_utils import now_et
-            end_date = now_et().date()
-        
-        # Get stores for this tenant, optionally filtered by manager or admin regions
-        user_role = g.current_user.get('role')
-        manager_username = request.args.get("manager_username")
-        
-        # If admin, filter stores by managers in assigned regions
-        if user_role == 'admin':
-            admin_regions = g.current_user.get('regions', [])
-            if not admin_regions:
-                # Admin with no regions sees no stores
-                return jsonify({
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
-                    "stores": [],
-                    "data": {}
-                }), 200
-            
-            # Get all managers in admin's assigned regions
-            from ..models import Manager
-            managers = Manager.query.filter_by(tenant_id=tenant_id).filter(
-                Manager.is_super_admin == False,
-                Manager.is_admin == False,
-                Manager.location.in_(admin_regions)
-            ).all()
-            
-            manager_usernames = [m.username for m in managers]
-            if not manager_usernames:
-                # No managers in assigned regions
-                return jsonify({
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
-                    "stores": [],
-                    "data": {}
-                }), 200
-            
-            # Get stores for these managers
-            from ..models import Store
-            stores = Store.query.filter_by(tenant_id=tenant_id).filter(
-                Store.manager_username.in_(manager_usernames)
-            ).all()
-            store_names = [store.name for store in stores]
-        elif manager_username:
-            # Filter by specific manager
-            stores = get_stores(tenant_id=tenant_id, manager_username=manager_username)
-            store_names = [store["name"] for store in stores]
-        else:
-            # Super-admin sees all stores
-            stores = get_stores(tenant_id=tenant_id)
-            store_names = [store["name"] for store in stores]
-        
-        # Get EOD reports for the date range, filtered by store names if admin
-        start_date_str = start_date.isoformat()
-        end_date_str = end_date.isoformat()
-        
-        eod_query = EOD.query.filter(
-            EOD.tenant_id == tenant_id,
-            EOD.report_date >= start_date_str,
-            EOD.report_date <= end_date_str
-        )
-        
-        # If admin, only show EODs for stores in their regions
-        if user_role == 'admin' and store_names:
-            eod_query = eod_query.filter(EOD.store_id.in_(store_names))
-        
-        eods = eod_query.all()
-        
-        # Group data by date and store
-        report_data = {}
-        
-        # Initialize all dates in range with empty data
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            report_data[date_str] = {}
-            for store_name in store_names:
-                report_data[date_str][store_name] = {
-                    "credit_amount": 0,
-                    "card1_amount": 0,
-                    "card_total": 0
-                }
-            current_date += timedelta(days=1)
-        
-        # Fill in actual EOD data
-        for eod in eods:
-            date_str = eod.report_date
-            store_name = eod.store_id
-            
-            if date_str in report_data and store_name in report_data[date_str]:
-                credit_amount = float(eod.credit_amount or 0)
-                card1_amount = float(eod.card1_amount or 0)
-                card_total = credit_amount + card1_amount
-                
-                report_data[date_str][store_name] = {
-                    "credit_amount": credit_amount,
-                    "card1_amount": card1_amount,
-                    "card_total": card_total
-                }
-        
-        # Format response
-        result = {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "stores": store_names,
-            "data": report_data
-        }
-        
-        return jsonify(result), 200
+        result = _build_eod_report(_CARD_REPORT_COLUMNS, "card_total")
+        return orjson_response(result)
         
     except Exception as e:
         import traceback
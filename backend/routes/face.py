@@ -195,7 +195,7 @@ def register_face():
             # Convert to dict format for find_best_match
             employee_dicts = []
             for emp in all_registered:
-                emp_dict = emp.to_dict()
+                emp_dict = emp.to_dict(include_face=True)
                 emp_dict['_id'] = emp.id
                 employee_dicts.append(emp_dict)
             
@@ -324,7 +324,7 @@ def recognize_face():
         # Convert to dict format for find_best_match
         employee_dicts = []
         for emp in registered_employees:
-            emp_dict = emp.to_dict()
+            emp_dict = emp.to_dict(include_face=True)
             emp_dict['_id'] = emp.id
             employee_dicts.append(emp_dict)
         
@@ -5,6 +5,8 @@ from ..auth import require_auth
 
 bp = Blueprint("inventory", __name__)
 
+_VALID_DEVICE_TYPES = frozenset({'metro', 'discontinued', 'unlocked'})
+
 @bp.route("/", methods=["GET"])
 @require_auth()
 def list_inventory():
@@ -12,9 +14,8 @@ def list_inventory():
     store_id = request.args.get("store_id")
     device_type = request.args.get("device_type")  # Optional filter by device type
     # Only use device_type if it's a valid value
-    if device_type and device_type.strip() and device_type.strip() in ['metro', 'discontinued', 'unlocked']:
-        device_type = device_type.strip()
-    else:
+    device_type = (device_type or "").strip()
+    if device_type not in _VALID_DEVICE_TYPES:
         device_type = None  # Don't filter if invalid or not provided
     items = get_inventory(tenant_id=tenant_id, store_id=store_id, device_type=device_type)
     return jsonify(items)
@@ -48,8 +49,7 @@ def add_item():
         
         device_type = data.get("device_type", "metro")  # Default to metro
         # Validate device_type
-        valid_types = ['metro', 'discontinued', 'unlocked']
-        if device_type not in valid_types:
+        if not isinstance(device_type, str) or device_type not in _VALID_DEVICE_TYPES:
             device_type = 'metro'
         
         tenant_id = g.tenant_id
@@ -1,8 +1,10 @@
 # backend/routes/managers.py
-from flask import Blueprint, request, jsonify, g
-from ..models import get_all_managers, create_manager, update_manager, get_manager_by_username, verify_password
+from flask import Blueprint, request, jsonify, g, current_app
+from sqlalchemy.exc import IntegrityError
+from ..database import db
+from ..models import get_store_managers, create_manager, update_manager, get_manager_by_username, get_manager_with_tenant_status, verify_password
 from ..config import Config
-from ..auth import generate_token, validate_password_strength, require_auth
+from ..auth import generate_token, validate_password_strength, is_duplicate_username_error, require_auth
 
 bp = Blueprint("managers", __name__)
 
@@ -12,7 +14,6 @@ def list_managers():
     """List all managers for the current tenant (super-admin sees all regular managers, admin sees only managers in assigned regions)"""
     tenant_id = g.tenant_id
     user_role = g.current_user.get('role')
-    all_managers = get_all_managers(tenant_id=tenant_id)
     
     # If admin, filter managers by assigned regions
     if user_role == 'admin':
@@ -21,27 +22,12 @@ def list_managers():
             # Admin with no regions sees nothing
             return jsonify([])
         
-        # Filter managers to only those in admin's assigned regions
-        filtered_managers = []
-        for manager in all_managers:
-            # Exclude super admins and other admins
-            if manager.get('is_super_admin') or manager.get('is_admin'):
-                continue
-            # Include managers whose location matches one of admin's regions
-            manager_location = manager.get('location', '').strip()
-            if manager_location and manager_location in admin_regions:
-                filtered_managers.append(manager)
-        
-        return jsonify(filtered_managers)
+        # Managers (excluding super admins and admins) whose location is one of admin's regions;
+        # locations are stored trimmed, so the match happens in SQL
+        return jsonify(get_store_managers(tenant_id, regions=admin_regions))
     
     # Super-admin sees all regular managers (excluding super-admins and admins)
-    regular_managers = []
-    for manager in all_managers:
-        # Exclude super admins and admins from the list
-        if not manager.get('is_super_admin') and not manager.get('is_admin'):
-            regular_managers.append(manager)
-    
-    return jsonify(regular_managers)
+    return jsonify(get_store_managers(tenant_id))
 
 @bp.post("/")
 @require_auth(roles=['super-admin'])
@@ -84,13 +70,15 @@ def add_manager():
         return jsonify(manager_info), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        # Database unique constraint violation for username
+        if is_duplicate_username_error(e.orig):
+            return jsonify({"error": "Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to create manager")
+        return jsonify({"error": f"Failed to create manager: {str(e)}"}), 500
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        # Check if it's a database unique constraint violation for username
-        error_str = str(e)
-        if ("UniqueViolation" in error_str or "duplicate key" in error_str.lower()) and ("username" in error_str.lower() or "ix_managers_username" in error_str.lower()):
-            return jsonify({"error": f"Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to create manager")
         return jsonify({"error": f"Failed to create manager: {str(e)}"}), 500
 
 @bp.put("/<username>")
@@ -127,13 +115,15 @@ def edit_manager(username):
         return jsonify(updated_manager), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        # Database unique constraint violation for username
+        if is_duplicate_username_error(e.orig):
+            return jsonify({"error": "Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to update manager")
+        return jsonify({"error": f"Failed to update manager: {str(e)}"}), 500
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        # Check if it's a database unique constraint violation for username
-        error_str = str(e)
-        if ("UniqueViolation" in error_str or "duplicate key" in error_str.lower()) and ("username" in error_str.lower() or "ix_managers_username" in error_str.lower()):
-            return jsonify({"error": f"Username with that name already exists"}), 409
+        current_app.logger.exception("Failed to update manager")
         return jsonify({"error": f"Failed to update manager: {str(e)}"}), 500
 
 @bp.get("/<username>")
@@ -162,7 +152,7 @@ def super_admin_login():
         return jsonify({"error": "Username and password required"}), 400
     
     # Find manager by username (will need tenant_id from manager record)
-    manager = get_manager_by_username(username)
+    manager, tenant_status = get_manager_with_tenant_status(username)
     if not manager:
         return jsonify({"error": "Invalid credentials"}), 401
     
@@ -178,11 +168,9 @@ def super_admin_login():
     if not tenant_id:
         return jsonify({"error": "Manager configuration error"}), 500
     
-    # Check tenant status
-    from ..models import Tenant
-    tenant = Tenant.query.get(tenant_id)
-    if tenant and tenant.status != 'active':
-        return jsonify({"error": f"Account is {tenant.status}. Please contact support."}), 403
+    # Check tenant status (loaded with the manager)
+    if tenant_status is not None and tenant_status != 'active':
+        return jsonify({"error": f"Account is {tenant_status}. Please contact support."}), 403
     
     # Generate JWT token
     token = generate_token({
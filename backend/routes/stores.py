@@ -4,7 +4,7 @@ import logging
 
 from ..models import (
     get_stores, create_store, delete_store, get_store_by_username, update_store,
-    verify_password, get_manager_by_username
+    verify_password, get_manager_with_tenant_status
 )
 from ..auth import require_auth, generate_token, validate_password_strength
 from ..utils.request_logging import (
@@ -624,7 +624,7 @@ def manager_login():
         return jsonify({"error": "Username and password required"}), 400
     
     # Try to find manager (we'll need tenant_id from the manager record)
-    manager = get_manager_by_username(username)
+    manager, tenant_status = get_manager_with_tenant_status(username)
     if not manager:
         return jsonify({"error": "Invalid credentials"}), 401
     
@@ -640,11 +640,9 @@ def manager_login():
     if not tenant_id:
         return jsonify({"error": "Manager configuration error"}), 500
     
-    # Check tenant status
-    from ..models import Tenant
-    tenant = Tenant.query.get(tenant_id)
-    if tenant and tenant.status != 'active':
-        return jsonify({"error": f"Account is {tenant.status}. Please contact support."}), 403
+    # Check tenant status (loaded with the manager)
+    if tenant_status is not None and tenant_status != 'active':
+        return jsonify({"error": f"Account is {tenant_status}. Please contact support."}), 403
     
     # Determine role
     if manager.get("is_super_admin"):
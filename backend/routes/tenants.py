@@ -223,15 +223,13 @@ def tenant_signup():
         password_hash = hash_password(temp_password)
         
         # Create tenant (without Stripe info yet - will be updated after payment)
-        tenant = create_tenant(
+        tenant_id = create_tenant(
             company_name=company_name,
             email=email,
             password_hash=password_hash,
             plan=plan
         )
         
-        tenant_id = tenant['id']
-        
         # Get Stripe configuration
         stripe_config = get_stripe_config()
         stripe_key = stripe_config['api_key']
@@ -4,13 +4,14 @@ from datetime import datetime, timedelta
 from backend.database import db
 from backend.models import Employee, TimeClock
 from backend.auth import require_auth
+from backend.utils.json_response import orjson_response, json_rows
 from backend.services.face_service import (
     find_best_match,
     validate_face_descriptor,
     compress_image,
     euclidean_distance
 )
-from backend.utils.timezone_utils import now_et, now_utc_naive, today_start_utc_naive, et_to_utc_naive
+from backend.utils.timezone_utils import now_et, now_utc_naive, today_start_utc_naive, et_to_utc_naive, get_app_timezone
 
 bp = Blueprint("timeclock", __name__)
 
@@ -161,7 +162,7 @@ def clock_in_face():
         # Convert to dict format for find_best_match
         employee_dicts = []
         for emp in registered_employees:
-            emp_dict = emp.to_dict()
+            emp_dict = emp.to_dict(include_face=True)
             emp_dict['_id'] = emp.id
             employee_dicts.append(emp_dict)
         
@@ -388,7 +389,7 @@ def clock_out_face():
         # Convert to dict format for find_best_match
         employee_dicts = []
         for emp in registered_employees:
-            emp_dict = emp.to_dict()
+            emp_dict = emp.to_dict(include_face=True)
             emp_dict['_id'] = emp.id
             employee_dicts.append(emp_dict)
         
@@ -482,11 +483,9 @@ def clock_out_face():
                         # Convert auto_clockout_time to ET if needed (it should already be in store timezone/ET)
                         if auto_clockout_time.tzinfo is None:
                             # If naive, assume it's in store timezone (ET)
-                            from backend.utils.timezone_utils import get_app_timezone
                             auto_clockout_et = get_app_timezone().localize(auto_clockout_time)
                         else:
                             # Convert to ET
-                            from backend.utils.timezone_utils import get_app_timezone
                             auto_clockout_et = auto_clockout_time.astimezone(get_app_timezone())
                         
                         # If it's past auto clock-out time, auto clock out
@@ -615,15 +614,13 @@ def get_today_entries():
             TimeClock.clock_in < tomorrow_start
         ).order_by(TimeClock.clock_in.desc()).all()
         
-        # Format entries for response
-        formatted_entries = [entry.to_dict() for entry in entries]
-        
-        return jsonify({
+        # Each entry is serialized straight to JSON bytes (same output as to_dict())
+        return orjson_response({
             "date": today_start.date().isoformat(),
             "store_id": store_id,
-            "employees": formatted_entries,
-            "total_count": len(formatted_entries)
-        }), 200
+            "employees": json_rows(entry.to_json_bytes() for entry in entries),
+            "total_count": len(entries)
+        })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -656,15 +653,13 @@ def get_history():
             TimeClock.clock_in >= start_date
         ).order_by(TimeClock.clock_in.desc()).all()
         
-        # Format entries for response
-        formatted_entries = [entry.to_dict() for entry in entries]
-        
-        return jsonify({
+        # Each entry is serialized straight to JSON bytes (same output as to_dict())
+        return orjson_response({
             "store_id": store_id,
-            "entries": formatted_entries,
-            "total_count": len(formatted_entries),
+            "entries": json_rows(entry.to_json_bytes() for entry in entries),
+            "total_count": len(entries),
             "days": days
-        }), 200
+        })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -700,15 +695,13 @@ def get_employee_history(employee_id):
             TimeClock.clock_in >= start_date
         ).order_by(TimeClock.clock_in.desc()).all()
         
-        # Format entries for response
-        formatted_entries = [entry.to_dict() for entry in entries]
-        
-        return jsonify({
+        # Each entry is serialized straight to JSON bytes (same output as to_dict())
+        return orjson_response({
             "employee_id": employee_id,
-            "entries": formatted_entries,
-            "total_count": len(formatted_entries),
+            "entries": json_rows(entry.to_json_bytes() for entry in entries),
+            "total_count": len(entries),
             "days": days
-        }), 200
+        })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,30 @@
+# backend/utils/json_response.py
+"""
+orjson-backed JSON responses for endpoints with large payloads.
+"""
+import orjson
+from flask import current_app
+
+
+def orjson_response(payload, status=200):
+    """
+    Serialize a response body with orjson instead of Flask's stdlib json encoder.
+    
+    Keys are sorted to match jsonify's output, and naive datetimes are emitted
+    in ISO format without an offset (the same text as .isoformat()).
+    """
+    return current_app.response_class(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def json_rows(rows):
+    """
+    Join pre-serialized JSON rows (e.g. from a model's to_json_bytes) into one JSON array.
+    
+    The result is an orjson.Fragment, so it can be passed to orjson_response on its own
+    or nested in a payload and is embedded verbatim without being parsed again.
+    """
+    return orjson.Fragment(b"[" + b",".join(rows) + b"]")
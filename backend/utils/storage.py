@@ -87,7 +87,7 @@ def update_storage_usage(tenant_id, additional_bytes):
         additional_bytes: Bytes to add (can be negative for deletion)
     
     Returns:
-        Updated tenant dict or None if failed
+        Updated used_storage_bytes for the tenant
     """
     try:
         # Check storage limit before adding
@@ -228,19 +228,23 @@ def calculate_database_storage(tenant_id):
     
     total_bytes = 0
     
-    # Count employee face images
-    employees = Employee.query.filter_by(tenant_id=tenant_id).all()
-    for emp in employees:
-        if emp.face_image:
-            total_bytes += calculate_base64_size(emp.face_image)
+    # Count employee face images (image columns are deferred, so select them directly)
+    face_images = db.session.query(Employee.face_image).filter(
+        Employee.tenant_id == tenant_id,
+        Employee.face_image.isnot(None)
+    ).all()
+    for (face_image,) in face_images:
+        total_bytes += calculate_base64_size(face_image)
     
     # Count timeclock face images
-    entries = TimeClock.query.filter_by(tenant_id=tenant_id).all()
-    for entry in entries:
-        if entry.clock_in_face_image:
-            total_bytes += calculate_base64_size(entry.clock_in_face_image)
-        if entry.clock_out_face_image:
-            total_bytes += calculate_base64_size(entry.clock_out_face_image)
+    entries = db.session.query(TimeClock.clock_in_face_image, TimeClock.clock_out_face_image).filter(
+        TimeClock.tenant_id == tenant_id
+    ).all()
+    for clock_in_face_image, clock_out_face_image in entries:
+        if clock_in_face_image:
+            total_bytes += calculate_base64_size(clock_in_face_image)
+        if clock_out_face_image:
+            total_bytes += calculate_base64_size(clock_out_face_image)
     
     return total_bytes
 
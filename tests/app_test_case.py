@@ -0,0 +1,52 @@
+"""
+Shared base class for tests that need the Flask app and a database
+
+Points the app at a private in-memory SQLite database and a test JWT secret (both
+must be set before backend.config is imported) and rebuilds the schema for every test.
+"""
+import os
+import unittest
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-unit-tests-only-0123456789")
+
+from backend.app import create_app
+from backend.auth import generate_token
+from backend.database import db
+from backend.models import Tenant
+
+
+class AppTestCase(unittest.TestCase):
+    """Base test case with an app context, a test client and a fresh schema"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the app once per test class"""
+        cls.app = create_app()
+        cls.app.config['TESTING'] = True
+
+    def setUp(self):
+        """Push an app context and recreate all tables"""
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Drop the session and tables, then pop the app context"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def create_tenant(self, email="owner@example.com", status="active"):
+        """Insert a tenant and return its id"""
+        tenant = Tenant(company_name="Test Co", email=email, password_hash="x", status=status)
+        db.session.add(tenant)
+        db.session.commit()
+        return tenant.id
+
+    def auth_headers(self, tenant_id, role="super-admin", **claims):
+        """Authorization headers carrying a token for the given tenant and role"""
+        token = generate_token({"tenant_id": tenant_id, "role": role, "username": "tester", **claims})
+        return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,126 @@
+"""
+Tests for the all-tenants auto clock-out run
+
+Covers:
+- Open entries at a due store are closed with AUTO type and SQL-computed hours
+- Entries that are already clocked out are left alone
+- An entry clocked out manually after the candidate SELECT is not overwritten
+- Auto clock-out times are cached per store-local date, not per timestamp
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app_test_case import AppTestCase
+from backend.database import db
+from backend.models import Employee, Store, TimeClock
+from backend.routes import auto_clockout
+from backend.utils.timezone_utils import get_app_timezone
+
+# 2024-01-15 is in EST (UTC-5): the 17:00 close means a 17:30 ET (22:30 UTC) auto clock-out
+NOW_ET = get_app_timezone().localize(datetime(2024, 1, 15, 17, 32))
+TODAY_START = datetime(2024, 1, 15, 5, 0)
+AUTO_CLOCK_OUT = datetime(2024, 1, 15, 22, 30)
+
+
+class TestRunAutoClockoutAllTenants(AppTestCase):
+    """Test cases for run_auto_clockout_all_tenants"""
+
+    def setUp(self):
+        """Create a tenant with one store closing at 17:00 ET and one employee"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        db.session.add(Store(
+            tenant_id=self.tenant_id, name="Main", username="main", password="x",
+            closing_time="17:00", timezone="America/New_York"
+        ))
+        employee = Employee(tenant_id=self.tenant_id, store_id="Main", name="Alice")
+        db.session.add(employee)
+        db.session.commit()
+        self.employee_id = employee.id
+
+    def add_entry(self, clock_in, clock_out=None):
+        """Insert a timeclock entry at Main and return its id"""
+        entry = TimeClock(
+            tenant_id=self.tenant_id, employee_id=self.employee_id, employee_name="Alice",
+            store_id="Main", clock_in=clock_in, clock_out=clock_out,
+            clock_out_type="MANUAL" if clock_out else None
+        )
+        db.session.add(entry)
+        db.session.commit()
+        return entry.id
+
+    def run_at_now(self):
+        """Run the all-tenants auto clock-out at NOW_ET"""
+        with patch.object(auto_clockout, "now_et", return_value=NOW_ET), \
+                patch.object(auto_clockout, "today_start_utc_naive", return_value=TODAY_START):
+            return auto_clockout.run_auto_clockout_all_tenants()
+
+    def test_closes_open_entries_at_due_store(self):
+        """Open entries get the AUTO clock-out time and hours from SQL; closed ones are untouched"""
+        open_id = self.add_entry(datetime(2024, 1, 15, 14, 0))
+        manual_out = datetime(2024, 1, 15, 16, 0)
+        closed_id = self.add_entry(datetime(2024, 1, 15, 13, 0), clock_out=manual_out)
+
+        result = self.run_at_now()
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["tenant_id"], self.tenant_id)
+        self.assertEqual(result[0]["clock_out_time"], AUTO_CLOCK_OUT)
+        self.assertAlmostEqual(result[0]["hours_worked"], 8.5)
+
+        db.session.expire_all()
+        closed = db.session.get(TimeClock, open_id)
+        self.assertEqual(closed.clock_out, AUTO_CLOCK_OUT)
+        self.assertEqual(closed.clock_out_type, "AUTO")
+        self.assertAlmostEqual(closed.hours_worked, 8.5)
+        untouched = db.session.get(TimeClock, closed_id)
+        self.assertEqual(untouched.clock_out, manual_out)
+        self.assertEqual(untouched.clock_out_type, "MANUAL")
+
+    def test_manual_clock_out_after_select_is_not_overwritten(self):
+        """An entry closed between the candidate SELECT and the UPDATE keeps its manual clock-out"""
+        entry_id = self.add_entry(datetime(2024, 1, 15, 14, 0))
+        manual_out = datetime(2024, 1, 15, 22, 31)
+        real_times = auto_clockout._auto_clockout_times
+
+        def clock_out_then_compute(*args):
+            # Runs after the candidate SELECT and before the UPDATE
+            db.session.execute(
+                TimeClock.__table__.update()
+                .where(TimeClock.id == entry_id)
+                .values(clock_out=manual_out, clock_out_type="MANUAL", hours_worked=8.52)
+            )
+            return real_times(*args)
+
+        with patch.object(auto_clockout, "_auto_clockout_times", side_effect=clock_out_then_compute):
+            result = self.run_at_now()
+
+        self.assertEqual(result, [])
+        db.session.expire_all()
+        entry = db.session.get(TimeClock, entry_id)
+        self.assertEqual(entry.clock_out, manual_out)
+        self.assertEqual(entry.clock_out_type, "MANUAL")
+        self.assertAlmostEqual(entry.hours_worked, 8.52)
+
+
+class TestAutoClockoutTimes(unittest.TestCase):
+    """Test cases for the auto clock-out time cache"""
+
+    def test_cache_is_keyed_on_store_local_date(self):
+        """Different times on the same store-local date reuse one cache entry"""
+        auto_clockout._auto_clockout_times_on.cache_clear()
+        first = auto_clockout._auto_clockout_times("17:00", "America/New_York", NOW_ET)
+        second = auto_clockout._auto_clockout_times("17:00", "America/New_York", NOW_ET + timedelta(minutes=3))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[2], AUTO_CLOCK_OUT)
+        info = auto_clockout._auto_clockout_times_on.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_store_local_date_is_used(self):
+        """A west-coast store resolves against its own date, not the ET date"""
+        # 01:00 ET on Jan 16 is still Jan 15 in Los Angeles; 17:30 PST is 01:30 UTC on Jan 16
+        now = get_app_timezone().localize(datetime(2024, 1, 16, 1, 0))
+        times = auto_clockout._auto_clockout_times("17:00", "America/Los_Angeles", now)
+        self.assertEqual(times[2], datetime(2024, 1, 16, 1, 30))
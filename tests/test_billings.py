@@ -0,0 +1,95 @@
+"""
+Tests for the billing summary
+
+Covers:
+- get_billings_by_stores groups bills per store with unpaid defaults
+- Legacy rows from before ck_store_billings_bill_type (mixed case, unknown types)
+  neither add stray keys nor hide the real bill
+- The billing GET endpoints answer with plain orjson responses and status codes
+"""
+from sqlalchemy import text
+
+from app_test_case import AppTestCase
+from backend.database import db
+from backend.models import Store, StoreBilling, get_billings_by_stores
+
+
+class TestGetBillingsByStores(AppTestCase):
+    """Test cases for get_billings_by_stores"""
+
+    def setUp(self):
+        """Create a tenant"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+
+    def add_bill(self, store_id, bill_type, amount, paid=True):
+        """Insert a billing row for 2024-01"""
+        db.session.add(StoreBilling(
+            tenant_id=self.tenant_id, store_id=store_id, bill_type=bill_type,
+            amount=amount, paid=paid, billing_month="2024-01"
+        ))
+
+    def test_groups_bills_per_store(self):
+        """Paid bills carry their amount; missing bills default to unpaid"""
+        self.add_bill("Main", "electricity", 120)
+        self.add_bill("Main", "gas", 40, paid=False)
+        db.session.commit()
+
+        billings = get_billings_by_stores(self.tenant_id, billing_month="2024-01")
+
+        self.assertEqual(billings, {"Main": {
+            "electricity": {"paid": True, "amount": 120.0},
+            "wifi": {"paid": False, "amount": 0},
+            "gas": {"paid": False, "amount": 0},
+        }})
+
+    def test_legacy_bill_types(self):
+        """A mixed-case row counts as its bill type and an unknown type is ignored"""
+        # Legacy rows can only exist where the CHECK constraint hasn't been added yet
+        db.session.execute(text("PRAGMA ignore_check_constraints = ON"))
+        try:
+            self.add_bill("Main", "WiFi", 60)
+            self.add_bill("Main", "water", 30)
+            db.session.commit()
+        finally:
+            db.session.execute(text("PRAGMA ignore_check_constraints = OFF"))
+
+        billings = get_billings_by_stores(self.tenant_id, billing_month="2024-01")
+
+        self.assertEqual(set(billings["Main"]), {"electricity", "wifi", "gas"})
+        self.assertEqual(billings["Main"]["wifi"], {"paid": True, "amount": 60.0})
+
+
+class TestBillingEndpoints(AppTestCase):
+    """Test cases for the billing GET endpoints"""
+
+    def setUp(self):
+        """Create a tenant with one store"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        db.session.add(Store(tenant_id=self.tenant_id, name="Main", username="main", password="x"))
+        db.session.commit()
+
+    def test_get_billings(self):
+        """Stores without billing rows get the empty billing"""
+        response = self.client.get("/api/billings/", headers=self.auth_headers(self.tenant_id))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/json")
+        body = response.get_json()
+        self.assertEqual(body["stores"], ["Main"])
+        self.assertEqual(body["billings"]["Main"]["wifi"], {"paid": False, "amount": 0})
+
+    def test_admin_without_regions(self):
+        """An admin with no regions sees no stores"""
+        response = self.client.get("/api/billings/", headers=self.auth_headers(self.tenant_id, role="admin"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["stores"], [])
+
+    def test_unknown_manager(self):
+        """An unknown manager gives 404 with an error body"""
+        response = self.client.get("/api/billings/manager/nobody", headers=self.auth_headers(self.tenant_id))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {"error": "Manager not found"})
@@ -0,0 +1,200 @@
+"""
+Tests for employee creation and updates
+
+Covers:
+- POST /api/employees/ rejects a phone number already used in the tenant (unique index)
+- Other integrity errors are not reported as duplicate phone numbers
+- PUT /api/employees/<id> updates phone number and hourly pay in the caller's tenant
+- Employees of another tenant are reported as not found and left unchanged
+- Duplicate phone numbers are rejected with 400
+- Requests that change nothing return the current employee
+"""
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app_test_case import AppTestCase
+from backend.database import db
+from backend.models import Employee, create_employee, update_employee
+
+
+class TestAddEmployee(AppTestCase):
+    """Test cases for POST /api/employees/ and the tenant phone number unique index"""
+
+    def setUp(self):
+        """Create a tenant with auth headers"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        self.headers = self.auth_headers(self.tenant_id, role="manager")
+
+    def post(self, body):
+        """POST a new employee as the tenant"""
+        return self.client.post("/api/employees/", json=body, headers=self.headers)
+
+    def test_duplicate_phone_number_is_rejected(self):
+        """A second employee with the same (stripped) phone number gives 400 and is not created"""
+        self.assertEqual(self.post({"name": "Alice", "phone_number": "555-0001"}).status_code, 201)
+
+        response = self.post({"name": "Bob", "phone_number": " 555-0001 "})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("555-0001", response.get_json()["error"])
+        self.assertEqual(Employee.query.count(), 1)
+
+    def test_blank_phone_numbers_do_not_collide(self):
+        """Missing and blank phone numbers are stored as NULL and may repeat"""
+        for body in ({"name": "Alice"}, {"name": "Bob", "phone_number": ""}, {"name": "Carol", "phone_number": "  "}):
+            self.assertEqual(self.post(body).status_code, 201)
+
+        self.assertEqual(Employee.query.filter(Employee.phone_number.is_(None)).count(), 3)
+
+    def test_same_phone_number_in_another_tenant(self):
+        """The index is per tenant, so another tenant may reuse the number"""
+        other_tenant_id = self.create_tenant(email="other@example.com")
+        create_employee(tenant_id=other_tenant_id, store_id="Main", name="Mallory", phone_number="555-0001")
+
+        self.assertEqual(self.post({"name": "Alice", "phone_number": "555-0001"}).status_code, 201)
+
+    def test_session_is_usable_after_duplicate(self):
+        """create_employee rolls back the failed insert so later writes still work"""
+        create_employee(tenant_id=self.tenant_id, store_id="Main", name="Alice", phone_number="555-0001")
+        with self.assertRaises(ValueError):
+            create_employee(tenant_id=self.tenant_id, store_id="Main", name="Bob", phone_number="555-0001")
+
+        create_employee(tenant_id=self.tenant_id, store_id="Main", name="Bob", phone_number="555-0002")
+        self.assertEqual(Employee.query.count(), 2)
+
+
+class TestEmployeeIntegrityErrors(AppTestCase):
+    """Only ux_employees_tenant_phone violations become duplicate phone number errors"""
+
+    def setUp(self):
+        """Create a tenant"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+
+    def test_missing_name_is_not_a_duplicate_phone(self):
+        """A NOT NULL violation is re-raised as is and the session stays usable"""
+        with self.assertRaises(IntegrityError):
+            create_employee(tenant_id=self.tenant_id, store_id="Main", name=None, phone_number="555-0001")
+
+        create_employee(tenant_id=self.tenant_id, store_id="Main", name="Alice", phone_number="555-0001")
+        self.assertEqual(Employee.query.count(), 1)
+
+    def test_unknown_tenant_is_not_a_duplicate_phone(self):
+        """A foreign-key violation on tenant_id is re-raised as is"""
+        db.session.execute(text("PRAGMA foreign_keys = ON"))
+        try:
+            with self.assertRaises(IntegrityError):
+                create_employee(tenant_id=self.tenant_id + 100, store_id="Main", name="Alice")
+        finally:
+            db.session.execute(text("PRAGMA foreign_keys = OFF"))
+
+    def test_update_reraises_other_integrity_errors(self):
+        """update_employee only translates the phone index violation (PostgreSQL wording)"""
+        employee_id = create_employee(tenant_id=self.tenant_id, store_id="Main", name="Alice")
+        errors = {
+            'violates foreign key constraint "employees_tenant_id_fkey"': IntegrityError,
+            'duplicate key value violates unique constraint "ux_employees_tenant_phone"': ValueError,
+        }
+        for message, expected in errors.items():
+            with self.subTest(message=message):
+                error = IntegrityError("UPDATE employees ...", {}, Exception(message))
+                with patch.object(db.session, "scalars", side_effect=error):
+                    with self.assertRaises(expected):
+                        update_employee(employee_id, tenant_id=self.tenant_id, phone_number="555-0001")
+
+
+class TestEditEmployee(AppTestCase):
+    """Test cases for PUT /api/employees/<id> and update_employee"""
+
+    def setUp(self):
+        """Create two tenants with one employee each, plus a second employee in the first"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        self.other_tenant_id = self.create_tenant(email="other@example.com")
+        self.alice_id = self.add_employee(self.tenant_id, "Alice", "555-0001", 15.0)
+        self.bob_id = self.add_employee(self.tenant_id, "Bob", "555-0002", 16.0)
+        self.mallory_id = self.add_employee(self.other_tenant_id, "Mallory", "555-0009", 20.0)
+        self.headers = self.auth_headers(self.tenant_id, role="manager")
+
+    def add_employee(self, tenant_id, name, phone_number, hourly_pay):
+        """Insert an employee and return its id"""
+        employee = Employee(
+            tenant_id=tenant_id, store_id="Main", name=name,
+            phone_number=phone_number, hourly_pay=hourly_pay, active=True
+        )
+        db.session.add(employee)
+        db.session.commit()
+        return employee.id
+
+    def put(self, employee_id, body):
+        """PUT an employee update as the first tenant"""
+        return self.client.put(f"/api/employees/{employee_id}", json=body, headers=self.headers)
+
+    def reload(self, employee_id):
+        """Fetch an employee fresh from the database"""
+        db.session.expire_all()
+        return db.session.get(Employee, employee_id)
+
+    def test_updates_own_employee(self):
+        """Phone number (stripped) and hourly pay are written and returned"""
+        response = self.put(self.alice_id, {"phone_number": " 555-1234 ", "hourly_pay": "17.5"})
+
+        self.assertEqual(response.status_code, 200)
+        employee = response.get_json()["employee"]
+        self.assertEqual(employee["phone_number"], "555-1234")
+        self.assertEqual(employee["hourly_pay"], 17.5)
+        alice = self.reload(self.alice_id)
+        self.assertEqual((alice.phone_number, alice.hourly_pay), ("555-1234", 17.5))
+
+    def test_blank_phone_number_is_cleared(self):
+        """A blank phone number is stored as NULL"""
+        response = self.put(self.alice_id, {"phone_number": "   "})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.reload(self.alice_id).phone_number)
+
+    def test_other_tenant_employee_is_not_found(self):
+        """An employee of another tenant gives 404 and is not modified"""
+        response = self.put(self.mallory_id, {"phone_number": "555-6666", "hourly_pay": 1})
+
+        self.assertEqual(response.status_code, 404)
+        mallory = self.reload(self.mallory_id)
+        self.assertEqual((mallory.phone_number, mallory.hourly_pay), ("555-0009", 20.0))
+
+    def test_missing_or_malformed_id_is_not_found(self):
+        """Unknown and non-numeric ids give 404"""
+        self.assertEqual(self.put(999999, {"hourly_pay": 1}).status_code, 404)
+        self.assertEqual(self.put("abc", {"hourly_pay": 1}).status_code, 404)
+
+    def test_duplicate_phone_number_is_rejected(self):
+        """Taking another employee's phone number in the same tenant gives 400 and changes nothing"""
+        response = self.put(self.alice_id, {"phone_number": "555-0002", "hourly_pay": 99})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("555-0002", response.get_json()["error"])
+        alice = self.reload(self.alice_id)
+        self.assertEqual((alice.phone_number, alice.hourly_pay), ("555-0001", 15.0))
+
+    def test_phone_number_of_other_tenant_is_allowed(self):
+        """Phone numbers only need to be unique within a tenant"""
+        response = self.put(self.alice_id, {"phone_number": "555-0009"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.reload(self.alice_id).phone_number, "555-0009")
+
+    def test_no_op_update_returns_current_employee(self):
+        """A body without phone number or hourly pay returns the employee unchanged"""
+        response = self.put(self.alice_id, {"name": "ignored"})
+
+        self.assertEqual(response.status_code, 200)
+        employee = response.get_json()["employee"]
+        self.assertEqual((employee["name"], employee["phone_number"]), ("Alice", "555-0001"))
+
+    def test_no_op_update_of_other_tenant_employee_is_not_found(self):
+        """The no-op path still enforces tenant ownership"""
+        response = self.put(self.mallory_id, {"name": "ignored"})
+
+        self.assertEqual(response.status_code, 404)
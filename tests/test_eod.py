@@ -0,0 +1,165 @@
+"""
+Tests for EOD reports
+
+Covers:
+- get_eods lists the employees who clocked in on each report's day
+- GET /api/eod/ serializes reports with to_json_bytes, matching get_eods
+- POST /api/eod/bulk with mixed, all-invalid and oversized batches
+"""
+from datetime import datetime
+from unittest.mock import patch
+
+from app_test_case import AppTestCase
+from backend.database import db
+from backend.models import EOD, Employee, TimeClock, create_eods, get_eods
+from backend.routes import eod as eod_routes
+
+
+class TestGetEods(AppTestCase):
+    """Test cases for get_eods"""
+
+    def setUp(self):
+        """Create a tenant with one employee"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        employee = Employee(tenant_id=self.tenant_id, store_id="Main", name="Alice")
+        db.session.add(employee)
+        db.session.commit()
+        self.employee_id = employee.id
+
+    def add_clock_in(self, name, clock_in, store_id="Main"):
+        """Insert a timeclock entry for the employee under the given name"""
+        db.session.add(TimeClock(
+            tenant_id=self.tenant_id, employee_id=self.employee_id, employee_name=name,
+            store_id=store_id, clock_in=clock_in
+        ))
+
+    def test_employees_worked_per_report_day(self):
+        """Only clock-ins on a report's own day and store are listed, even for days months apart"""
+        db.session.add(EOD(tenant_id=self.tenant_id, store_id="Main", report_date="2024-01-15"))
+        db.session.add(EOD(tenant_id=self.tenant_id, store_id="Main", report_date="2024-01-16"))
+        db.session.add(EOD(tenant_id=self.tenant_id, store_id="Main", report_date="2024-06-01"))
+        self.add_clock_in("Alice", datetime(2024, 1, 15, 14, 0))
+        self.add_clock_in("Bob", datetime(2024, 1, 15, 15, 0))
+        self.add_clock_in("Carol", datetime(2024, 1, 16, 9, 0))
+        self.add_clock_in("Dave", datetime(2024, 3, 1, 9, 0))
+        self.add_clock_in("Erin", datetime(2024, 6, 1, 23, 59))
+        self.add_clock_in("Frank", datetime(2024, 6, 1, 10, 0), store_id="Other")
+        db.session.commit()
+
+        employees = {eod["report_date"]: eod["employees_worked"] for eod in get_eods(tenant_id=self.tenant_id)}
+
+        self.assertEqual(employees, {
+            "2024-01-15": ["Alice", "Bob"],
+            "2024-01-16": ["Carol"],
+            "2024-06-01": ["Erin"],
+        })
+
+    def test_list_endpoint_matches_get_eods(self):
+        """GET /api/eod/ returns exactly the get_eods dicts, including created_at and employees_worked"""
+        db.session.add(EOD(
+            tenant_id=self.tenant_id, store_id="Main", report_date="2024-01-15", cash_amount=12.5,
+            denom_20_count=3, created_at=datetime(2024, 1, 15, 23, 0, 0, 654321)
+        ))
+        db.session.add(EOD(tenant_id=self.tenant_id, store_id="Main", report_date="2024-01-14"))
+        self.add_clock_in("Alice", datetime(2024, 1, 15, 14, 0))
+        db.session.commit()
+
+        response = self.client.get(
+            "/api/eod/", query_string={"store_id": "Main"}, headers=self.auth_headers(self.tenant_id)
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), get_eods(tenant_id=self.tenant_id, store_id="Main"))
+        self.assertEqual(response.get_json()[0]["employees_worked"], ["Alice"])
+
+
+class TestAddEodBulk(AppTestCase):
+    """Test cases for POST /api/eod/bulk"""
+
+    def setUp(self):
+        """Create a tenant and auth headers for it"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        self.headers = self.auth_headers(self.tenant_id, role="manager")
+
+    def post_bulk(self, reports):
+        """POST a list of EOD reports to the bulk endpoint"""
+        return self.client.post("/api/eod/bulk", json=reports, headers=self.headers)
+
+    def test_mixed_valid_and_invalid_items(self):
+        """Valid items are created; ids line up with the submitted list and failures are reported"""
+        response = self.post_bulk([
+            {"store_id": "Main", "report_date": "2024-01-15", "cash_amount": "100.5"},
+            {"store_id": "Main"},
+            {"store_id": "Main", "report_date": "2024-01-16", "cash_amount": -1},
+            {"store_id": "Other", "report_date": "2024-01-16", "over_short": -3, "notes": "short"},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        body = response.get_json()
+        self.assertEqual(body["failed"], [
+            {"index": 1, "error": "report_date is required"},
+            {"index": 2, "error": "All amounts and counts must be non-negative (except Over/Short)"},
+        ])
+        ids = body["ids"]
+        self.assertEqual(len(ids), 4)
+        self.assertIsNone(ids[1])
+        self.assertIsNone(ids[2])
+
+        first = db.session.get(EOD, int(ids[0]))
+        self.assertEqual((first.tenant_id, first.store_id, first.cash_amount), (self.tenant_id, "Main", 100.5))
+        self.assertEqual(first.submitted_by, "Unknown")
+        last = db.session.get(EOD, int(ids[3]))
+        self.assertEqual((last.store_id, last.over_short, last.notes), ("Other", -3, "short"))
+        self.assertEqual(EOD.query.count(), 2)
+
+    def test_all_invalid_items(self):
+        """A batch with no valid items creates nothing and returns 400"""
+        response = self.post_bulk([{"store_id": "Main"}, "not an object"])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {
+            "ids": [None, None],
+            "failed": [
+                {"index": 0, "error": "report_date is required"},
+                {"index": 1, "error": "Each EOD report must be a JSON object"},
+            ],
+        })
+        self.assertEqual(EOD.query.count(), 0)
+
+    def test_batch_size_cap(self):
+        """Batches over the limit are rejected up front; a batch at the limit is accepted"""
+        with patch.object(eod_routes, "_EOD_BULK_LIMIT", 3):
+            report = {"store_id": "Main", "report_date": "2024-01-15"}
+            too_many = self.post_bulk([report] * 4)
+            at_limit = self.post_bulk([report] * 3)
+
+        self.assertEqual(too_many.status_code, 400)
+        self.assertIn("At most 3", too_many.get_json()["error"])
+        self.assertEqual(at_limit.status_code, 201)
+        self.assertEqual(EOD.query.count(), 3)
+
+    def test_default_limit_is_500(self):
+        """A 501-item batch is rejected with the default limit"""
+        response = self.post_bulk([{"store_id": "Main", "report_date": "2024-01-15"}] * 501)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(EOD.query.count(), 0)
+
+    def test_non_list_body(self):
+        """A single object or an empty list is rejected"""
+        self.assertEqual(self.post_bulk({"store_id": "Main", "report_date": "2024-01-15"}).status_code, 400)
+        self.assertEqual(self.post_bulk([]).status_code, 400)
+
+    def test_insert_failure_rolls_back(self):
+        """If the commit fails, create_eods rolls back the flushed batch before re-raising"""
+        reports = [
+            {"store_id": "Main", "report_date": "2024-01-15"},
+            {"store_id": "Main", "report_date": "2024-01-16"},
+        ]
+        with patch.object(db.session, "commit", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                create_eods(tenant_id=self.tenant_id, reports=reports)
+
+        self.assertEqual(EOD.query.count(), 0)
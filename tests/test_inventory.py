@@ -0,0 +1,57 @@
+"""
+Tests for inventory device type handling
+
+Covers:
+- POST /api/inventory/ keeps valid device types and falls back to 'metro' otherwise,
+  including non-string JSON values
+- GET /api/inventory/ only filters by a valid device type
+"""
+from app_test_case import AppTestCase
+from backend.models import Inventory
+
+
+class TestInventoryDeviceType(AppTestCase):
+    """Test cases for device_type validation in the inventory routes"""
+
+    def setUp(self):
+        """Create a tenant with auth headers"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        self.headers = self.auth_headers(self.tenant_id, role="manager")
+
+    def add_item(self, name, **extra):
+        """POST a new inventory item at Main"""
+        body = {"store_id": "Main", "sku": "Apple", "name": name, **extra}
+        return self.client.post("/api/inventory/", json=body, headers=self.headers)
+
+    def test_add_item_device_types(self):
+        """Valid types are kept; missing, unknown, list and object values become 'metro'"""
+        cases = [
+            ("valid", {"device_type": "unlocked"}, "unlocked"),
+            ("missing", {}, "metro"),
+            ("unknown", {"device_type": "prepaid"}, "metro"),
+            ("list", {"device_type": ["unlocked"]}, "metro"),
+            ("object", {"device_type": {"type": "unlocked"}}, "metro"),
+        ]
+        for name, extra, expected in cases:
+            with self.subTest(name=name):
+                response = self.add_item(name, **extra)
+                self.assertEqual(response.status_code, 201)
+                item = Inventory.query.filter_by(tenant_id=self.tenant_id, name=name).one()
+                self.assertEqual(item.device_type, expected)
+
+    def test_list_inventory_filter(self):
+        """A valid filter (whitespace stripped) narrows the list; an invalid one is ignored"""
+        self.add_item("Phone A", device_type="metro")
+        self.add_item("Phone B", device_type="unlocked")
+
+        def names(device_type):
+            response = self.client.get(
+                "/api/inventory/", query_string={"store_id": "Main", "device_type": device_type},
+                headers=self.headers
+            )
+            self.assertEqual(response.status_code, 200)
+            return sorted(item["name"] for item in response.get_json())
+
+        self.assertEqual(names(" unlocked "), ["Phone B"])
+        self.assertEqual(names("bogus"), ["Phone A", "Phone B"])
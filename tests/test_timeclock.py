@@ -0,0 +1,78 @@
+"""
+Tests for the timeclock list endpoints
+
+Covers:
+- TimeClock.to_json_bytes produces the same JSON as to_dict()
+- /history and /employee/<id>/history return entries identical to to_dict(), newest first
+"""
+from datetime import datetime, timedelta
+
+import orjson
+
+from app_test_case import AppTestCase
+from backend.database import db
+from backend.models import Employee, TimeClock
+from backend.utils.timezone_utils import now_utc_naive
+
+
+class TestTimeclockLists(AppTestCase):
+    """Test cases for serializing timeclock entries in list responses"""
+
+    def setUp(self):
+        """Create a tenant with one employee, one closed and one open entry"""
+        super().setUp()
+        self.tenant_id = self.create_tenant()
+        employee = Employee(tenant_id=self.tenant_id, store_id="Main", name="Alice")
+        db.session.add(employee)
+        db.session.commit()
+        self.employee_id = employee.id
+
+        now = now_utc_naive()
+        clock_in = now - timedelta(hours=9, microseconds=-123456)
+        self.closed = TimeClock(
+            tenant_id=self.tenant_id, employee_id=self.employee_id, employee_name="Alice", store_id="Main",
+            clock_in=clock_in, clock_out=clock_in + timedelta(hours=8), hours_worked=8.0,
+            clock_in_confidence=0.91, clock_out_type="MANUAL"
+        )
+        self.open = TimeClock(
+            tenant_id=self.tenant_id, employee_id=self.employee_id, employee_name="Alice", store_id="Main",
+            clock_in=now.replace(microsecond=0) - timedelta(minutes=5)
+        )
+        db.session.add_all([self.closed, self.open])
+        db.session.commit()
+        self.headers = self.auth_headers(self.tenant_id, role="manager")
+
+    def test_to_json_bytes_matches_to_dict(self):
+        """Datetimes (with and without microseconds) and None values serialize like to_dict()"""
+        for entry in (self.closed, self.open):
+            with self.subTest(entry_id=entry.id):
+                self.assertEqual(orjson.loads(entry.to_json_bytes()), entry.to_dict())
+
+    def test_history_entries_match_to_dict(self):
+        """The store history lists every entry as to_dict() would, newest first"""
+        response = self.client.get(
+            "/api/timeclock/history", query_string={"store_id": "Main"}, headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body["entries"], [self.open.to_dict(), self.closed.to_dict()])
+        self.assertEqual((body["total_count"], body["days"]), (2, 30))
+
+    def test_employee_history_entries_match_to_dict(self):
+        """The employee history lists every entry as to_dict() would"""
+        response = self.client.get(f"/api/timeclock/employee/{self.employee_id}/history", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body["entries"], [self.open.to_dict(), self.closed.to_dict()])
+        self.assertEqual(body["total_count"], 2)
+
+    def test_empty_history(self):
+        """No entries gives an empty JSON array"""
+        response = self.client.get(
+            "/api/timeclock/history", query_string={"store_id": "Other"}, headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["entries"], [])